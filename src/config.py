@@ -1,39 +1,98 @@
 # config.py
 
 import os
+from dataclasses import dataclass
+from functools import cache, lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 project_root = Path(__file__).parent.parent
 env_path = project_root / ".env"
+
+
+@cache
+def _load_env_once(path: str, mtime: float) -> None:
+    """Load the .env file once per (path, mtime); re-imports become no-ops."""
+    load_dotenv(path, override=True)
+
+
 if env_path.exists():
-    load_dotenv(env_path, override=True)
+    _load_env_once(str(env_path), env_path.stat().st_mtime)
 
 
-class Config:
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """Immutable snapshot of environment configuration."""
+
     # Git providers
-    GITHUB_API_KEY = os.getenv("GITHUB_API_KEY", "")
-    GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+    GITHUB_API_KEY: str
+    GITHUB_API_URL: str
 
-    GITLAB_API_KEY = os.getenv("GITLAB_API_KEY", "")
-    GITLAB_API_URL = os.getenv("GITLAB_API_URL", "https://gitlab.com/api/v4")
+    GITLAB_API_KEY: str
+    GITLAB_API_URL: str
 
     # AI Reviewers
-    REVIEWER_PROVIDER = os.getenv("REVIEWER_PROVIDER", "gemini").lower()  # gemini, openai_like
+    REVIEWER_PROVIDER: str  # gemini, openai_like
 
     # Gemini AI
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-    GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    GEMINI_API_KEY: str
+    GEMINI_MODEL: str
 
     # OpenAI-Like API (OpenRouter, Ollama, Together AI, etc.)
-    OPENAI_LIKE_API_KEY = os.getenv("OPENAI_LIKE_API_KEY", "")
-    OPENAI_LIKE_MODEL = os.getenv("OPENAI_LIKE_MODEL", "google/gemini-2.5-flash")
-    OPENAI_LIKE_BASE_URL = os.getenv("OPENAI_LIKE_BASE_URL", "https://openrouter.ai/api/v1")
+    OPENAI_LIKE_API_KEY: str
+    OPENAI_LIKE_MODEL: str
+    OPENAI_LIKE_BASE_URL: str
 
     # HTTP settings
-    TIMEOUT = int(os.getenv("TIMEOUT", "30"))
-    MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+    TIMEOUT: int
+    MAX_RETRIES: int
+
+    # Fetch full file bodies for changed files (diffs alone otherwise)
+    FETCH_FILE_CONTENT: bool
+
+    # Concurrent per-file LLM review calls
+    REVIEW_CONCURRENCY: int
+
+    # Review-result cache policy: enabled, read_only, write_only,
+    # replay (cache only, miss is an error), or disabled
+    REVIEW_CACHE_MODE: str
+
+    # Max characters of a new file's content embedded in the report
+    REPORT_MAX_EMBED: int
+
+    # Console log level (file sink keeps the full level)
+    CONSOLE_LOG_LEVEL: str
 
     # Development settings
-    PROVIDERS_MODE = os.getenv("PROVIDERS_MODE", "online").lower()
+    PROVIDERS_MODE: str
+
+
+@lru_cache(maxsize=1)
+def get_config() -> _Config:
+    """Build the configuration snapshot once, reading os.environ in a single pass."""
+    env = dict(os.environ)
+    return _Config(
+        GITHUB_API_KEY=env.get("GITHUB_API_KEY", ""),
+        GITHUB_API_URL=env.get("GITHUB_API_URL", "https://api.github.com"),
+        GITLAB_API_KEY=env.get("GITLAB_API_KEY", ""),
+        GITLAB_API_URL=env.get("GITLAB_API_URL", "https://gitlab.com/api/v4"),
+        REVIEWER_PROVIDER=env.get("REVIEWER_PROVIDER", "gemini").lower(),
+        GEMINI_API_KEY=env.get("GEMINI_API_KEY", ""),
+        GEMINI_MODEL=env.get("GEMINI_MODEL", "gemini-2.5-flash"),
+        OPENAI_LIKE_API_KEY=env.get("OPENAI_LIKE_API_KEY", ""),
+        OPENAI_LIKE_MODEL=env.get("OPENAI_LIKE_MODEL", "google/gemini-2.5-flash"),
+        OPENAI_LIKE_BASE_URL=env.get("OPENAI_LIKE_BASE_URL", "https://openrouter.ai/api/v1"),
+        TIMEOUT=int(env.get("TIMEOUT", "30")),
+        MAX_RETRIES=int(env.get("MAX_RETRIES", "3")),
+        FETCH_FILE_CONTENT=env.get("FETCH_FILE_CONTENT", "true").lower() in ("1", "true", "yes"),
+        REVIEW_CONCURRENCY=int(env.get("REVIEW_CONCURRENCY", "8")),
+        REVIEW_CACHE_MODE=env.get("REVIEW_CACHE_MODE", "enabled").lower(),
+        REPORT_MAX_EMBED=int(env.get("REPORT_MAX_EMBED", "8192")),
+        CONSOLE_LOG_LEVEL=env.get("CONSOLE_LOG_LEVEL", "INFO").upper(),
+        PROVIDERS_MODE=env.get("PROVIDERS_MODE", "online").lower(),
+    )
+
+
+# Backward-compatible alias: existing code accesses Config.<ATTR> directly.
+Config = get_config()
@@ -1,17 +1,54 @@
 import argparse
+import re
 from datetime import UTC, datetime
 from pathlib import Path
 
 from src.config import Config
-from src.providers.github_provider import GitHubProvider
-from src.providers.gitlab_provider import GitLabProvider
-from src.report.report_builder import ReportBuilder
-from src.reviewers.reviewer_factory import ReviewerFactory
 from src.utils.logging import get_logger
 
 logger = get_logger()
 
 
+# Providers (and transitively the LLM SDKs pulled in by the reviewer stack)
+# are imported lazily so a run only pays for the modules it actually uses.
+def _make_github_provider():
+    from src.providers.github_provider import GitHubProvider  # noqa: PLC0415
+
+    return GitHubProvider()
+
+
+def _make_gitlab_provider():
+    from src.providers.gitlab_provider import GitLabProvider  # noqa: PLC0415
+
+    return GitLabProvider()
+
+
+# Dispatch on the URL host instead of substring checks, so a host name
+# appearing in a path fragment can't select the wrong provider.
+_PROVIDER_RE = re.compile(r"https?://([^/]+)/")
+_PROVIDERS = {
+    "github.com": ("GitHub", _make_github_provider),
+    "gitlab.com": ("GitLab", _make_gitlab_provider),
+}
+
+
+def _provider_for_host(host: str):
+    """Resolve the provider entry for a URL host.
+
+    True subdomains such as api.github.com dispatch to the same provider
+    as the base host; anything else is rejected — the provider URL
+    parsers are pinned to the canonical hosts, so looser matches would
+    only fail later with a confusing format error.
+    """
+    entry = _PROVIDERS.get(host)
+    if entry is not None:
+        return entry
+    for base_host, candidate in _PROVIDERS.items():
+        if host.endswith("." + base_host):
+            return candidate
+    return None
+
+
 def main():
     parser = argparse.ArgumentParser(description="Code Review Tool (GitHub/GitLab + Gemini)")
     parser.add_argument("merge_request_url", type=str, help="URL of the merge request to review")
@@ -34,15 +71,14 @@ def main():
         logger.info(f"AI configured: provider={configured_provider}")
 
 
-    if "github.com" in args.merge_request_url:
-        logger.info("Provider detected: GitHub")
-        provider = GitHubProvider()
-    elif "gitlab.com" in args.merge_request_url:
-        logger.info("Provider detected: GitLab")
-        provider = GitLabProvider()
-    else:
+    host_match = _PROVIDER_RE.match(args.merge_request_url)
+    provider_entry = _provider_for_host(host_match.group(1).lower()) if host_match else None
+    if provider_entry is None:
         logger.error("Unsupported merge request URL")
         return
+    provider_label, make_provider = provider_entry
+    logger.info(f"Provider detected: {provider_label}")
+    provider = make_provider()
 
     logger.info("Fetching merge request data...")
     if hasattr(provider, "fetch_merge_request_data"):
@@ -73,6 +109,8 @@ def main():
     logger.info(f"Author: {author_name}")
 
     logger.info("Starting AI analysis...")
+    from src.reviewers.reviewer_factory import ReviewerFactory  # noqa: PLC0415
+
     validation = ReviewerFactory.validate_configuration()
     if not validation["valid"]:
         for error in validation["errors"]:
@@ -101,8 +139,9 @@ def main():
         logger.info("ℹ️  AI analysis skipped or yielded no results")
 
     logger.info("Building report...")
+    from src.report.report_builder import ReportBuilder  # noqa: PLC0415
+
     report_builder = ReportBuilder()
-    report = report_builder.generate_report(report_data)
 
     logger.info("Saving report...")
     if args.output:
@@ -114,7 +153,9 @@ def main():
     ts = datetime.now(UTC).strftime("%Y%m%d-%H%M%S-UTC")
     filename = f"review-{ts}.md"
     out_path = out_dir / filename
-    out_path.write_text(report, encoding="utf-8")
+    # Stream the report into the file instead of materializing it first.
+    with out_path.open("w", encoding="utf-8") as report_file:
+        report_builder.generate_report_to(report_file, report_data)
     logger.info(f"Report saved: {out_path}")
     # Log token usage if available from reviewer
     try:
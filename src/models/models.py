@@ -1,4 +1,6 @@
 class MergeRequest:
+    __slots__ = ("author", "created_at", "description", "files_changed", "id", "title", "updated_at")
+
     def __init__(self, mr_id, title, description, author, created_at, updated_at, files_changed):
         self.id = mr_id
         self.title = title
@@ -10,6 +12,8 @@ class MergeRequest:
 
 
 class ReviewReport:
+    __slots__ = ("comments", "merge_request")
+
     def __init__(self, merge_request, comments):
         self.merge_request = merge_request
         self.comments = comments
@@ -18,12 +22,12 @@ class ReviewReport:
         self.comments.append(comment)
 
     def generate_report(self):
-        report_content = f"## Review Report for Merge Request: {self.merge_request.title}\n"
-        report_content += f"**Author:** {self.merge_request.author}\n"
-        report_content += f"**Created At:** {self.merge_request.created_at}\n"
-        report_content += f"**Updated At:** {self.merge_request.updated_at}\n"
-        report_content += f"**Description:** {self.merge_request.description}\n\n"
-        report_content += "### Comments:\n"
-        for comment in self.comments:
-            report_content += f"- {comment}\n"
-        return report_content
+        header = (
+            f"## Review Report for Merge Request: {self.merge_request.title}\n"
+            f"**Author:** {self.merge_request.author}\n"
+            f"**Created At:** {self.merge_request.created_at}\n"
+            f"**Updated At:** {self.merge_request.updated_at}\n"
+            f"**Description:** {self.merge_request.description}\n\n"
+            "### Comments:\n"
+        )
+        return header + "".join(f"- {comment}\n" for comment in self.comments)
@@ -1,85 +1,118 @@
 import re
+from itertools import pairwise
 from typing import Any
 
+# Compiled once at import and shared by every DiffParser method so the three
+# entry points (parse / parse_multi_file_diff / extract_file_chunks) reuse the
+# same patterns instead of re-resolving class attributes per line.
+FILE_HEADER_RE = re.compile(r"^diff --git a/(\S+) b/(\S+)", re.ASCII)
+HUNK_HEADER_RE = re.compile(
+    r"^@@ -(?P<old_start>\d+),(?P<old_len>\d+) \+(?P<new_start>\d+),(?P<new_len>\d+) @@", re.ASCII
+)
+
+# Start-of-line anchor for per-file boundaries in a multi-file diff.
+_FILE_SPLIT_RE = re.compile(r"(?m)^diff --git ", re.ASCII)
+
 
 class DiffParser:
     """Parses unified diff text into a simple structure."""
 
-    FILE_HEADER_RE = re.compile(r"^diff --git a/(\S+) b/(\S+)")
-    HUNK_HEADER_RE = re.compile(r"^@@ -(?P<old_start>\d+),(?P<old_len>\d+) \+(?P<new_start>\d+),(?P<new_len>\d+) @@")
+    FILE_HEADER_RE = FILE_HEADER_RE
+    HUNK_HEADER_RE = HUNK_HEADER_RE
 
     def parse(self, diff_text: str) -> dict[str, Any]:
-        if not diff_text.strip():
+        if not diff_text or diff_text.isspace():
             return {}
 
         lines = diff_text.splitlines()
-        file_match = self.FILE_HEADER_RE.match(lines[0]) if lines else None
+        file_match = FILE_HEADER_RE.match(lines[0]) if lines else None
         if not file_match:
             raise ValueError("Invalid diff format: missing file header")
         _file_a, file_b = file_match.groups()
         file_name = file_b
 
-        changes = []
+        # A run of '-' lines followed by a run of '+' lines forms one
+        # replacement block; pair them positionally when the block ends
+        # instead of back-patching the previous change's "new" field.
+        modifications: list[dict[str, Any]] = []
+        pending_dels: list[str] = []
+        pending_adds: list[str] = []
+        pair_start_line = 0
         old_line_no = None
         new_line_no = None
 
+        def _flush_block() -> None:
+            if pending_dels and pending_adds:
+                for offset, (old, new) in enumerate(zip(pending_dels, pending_adds)):
+                    modifications.append({"line": pair_start_line + offset, "old": old, "new": new})
+            pending_dels.clear()
+            pending_adds.clear()
+
         for line in lines:
-            hunk = self.HUNK_HEADER_RE.match(line)
-            if hunk:
-                old_line_no = int(hunk.group("old_start"))
-                new_line_no = int(hunk.group("new_start"))
-                continue
-            if line.startswith(("+++", "---", "diff --git", "index ")):
+            # Dispatch on the first character; only lines whose first char is
+            # ambiguous ('-' vs '---', '+' vs '+++', 'd'/'i' metadata) pay for
+            # a startswith check.
+            head = line[:1]
+            if head == "@":
+                hunk = HUNK_HEADER_RE.match(line)
+                if hunk:
+                    _flush_block()
+                    old_line_no = int(hunk.group("old_start"))
+                    new_line_no = int(hunk.group("new_start"))
+                    continue
+            elif (head == "d" or head == "i") and line.startswith(("diff --git", "index ")):
                 continue
             if old_line_no is None or new_line_no is None:
                 continue
-            if line.startswith("-"):
-                removed_content = line[1:]
-                changes.append({"line": new_line_no, "old": removed_content, "new": None})
+            if head == "-":
+                if line.startswith("---"):
+                    continue
+                if pending_adds:
+                    _flush_block()
+                if not pending_dels:
+                    pair_start_line = new_line_no
+                pending_dels.append(line[1:])
                 old_line_no += 1
-            elif line.startswith("+"):
-                added_content = line[1:]
-                if changes and changes[-1]["new"] is None:
-                    changes[-1]["new"] = added_content
-                else:
-                    changes.append({"line": new_line_no, "old": None, "new": added_content})
+            elif head == "+":
+                if line.startswith("+++"):
+                    continue
+                pending_adds.append(line[1:])
                 new_line_no += 1
             else:
+                _flush_block()
                 old_line_no += 1
                 new_line_no += 1
 
-        modifications = [c for c in changes if c["old"] is not None and c["new"] is not None]
+        _flush_block()
 
         return {
             "file": file_name,
             "changes": modifications,
         }
 
+    @staticmethod
+    def _iter_file_slices(diff_text: str):
+        """Yield one substring per file by slicing between `diff --git` headers.
+
+        Avoids the accumulate-lines-then-rejoin roundtrip: the original text is
+        scanned once for header offsets and each per-file diff is a plain slice.
+        """
+        starts = [m.start() for m in _FILE_SPLIT_RE.finditer(diff_text)]
+        if not starts:
+            return
+        starts.append(len(diff_text))
+        for begin, end in pairwise(starts):
+            yield diff_text[begin:end]
+
     def parse_multi_file_diff(self, diff_text: str) -> list[dict[str, Any]]:
         """Parse diff text containing multiple files into list of file diffs."""
-        if not diff_text.strip():
+        if not diff_text or diff_text.isspace():
             return []
 
         files = []
-        current_file_lines = []
-
-        for line in diff_text.splitlines():
-            if line.startswith("diff --git"):
-                if current_file_lines:
-                    try:
-                        file_diff = self.parse("\n".join(current_file_lines))
-                        if file_diff:
-                            files.append(file_diff)
-                    except ValueError:
-                        pass
-                current_file_lines = [line]
-            else:
-                current_file_lines.append(line)
-
-        # Process last file
-        if current_file_lines:
+        for file_slice in self._iter_file_slices(diff_text):
             try:
-                file_diff = self.parse("\n".join(current_file_lines))
+                file_diff = self.parse(file_slice)
                 if file_diff:
                     files.append(file_diff)
             except ValueError:
@@ -87,27 +120,19 @@ class DiffParser:
 
         return files
 
-    def extract_file_chunks(self, diff_text: str) -> list[dict[str, str]]:
-        """Extract individual file diffs with their raw content."""
-        if not diff_text.strip():
-            return []
-
-        chunks = []
-        current_chunk = []
-        current_file = None
-
-        for line in diff_text.splitlines():
-            if line.startswith("diff --git"):
-                if current_chunk and current_file:
-                    chunks.append({"file": current_file, "diff": "\n".join(current_chunk)})
+    def iter_file_chunks(self, diff_text: str):
+        """Yield individual file diffs with their raw content.
 
-                match = self.FILE_HEADER_RE.match(line)
-                current_file = match.group(2) if match else "unknown"
-                current_chunk = [line]
-            else:
-                current_chunk.append(line)
-
-        if current_chunk and current_file:
-            chunks.append({"file": current_file, "diff": "\n".join(current_chunk)})
+        Streaming keeps one chunk alive at a time, so a large multi-file
+        diff is never held twice (raw text plus a full parsed list).
+        """
+        if not diff_text or diff_text.isspace():
+            return
+        for file_slice in self._iter_file_slices(diff_text):
+            match = FILE_HEADER_RE.match(file_slice)
+            file_name = match.group(2) if match else "unknown"
+            yield {"file": file_name, "diff": file_slice.rstrip("\n")}
 
-        return chunks
+    def extract_file_chunks(self, diff_text: str) -> list[dict[str, str]]:
+        """Extract individual file diffs with their raw content."""
+        return list(self.iter_file_chunks(diff_text))
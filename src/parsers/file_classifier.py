@@ -14,13 +14,13 @@ class FileClassifier:
             "xml": [".xml"],
             "other": [],
         }
+        # Reverse index: one dict lookup per file instead of scanning every
+        # type's extension list.
+        self._ext_to_type = {ext: file_type for file_type, exts in self.file_types.items() for ext in exts}
 
     def classify_file(self, file_name):
         extension = self.get_file_extension(file_name)
-        for file_type, extensions in self.file_types.items():
-            if extension in extensions:
-                return file_type
-        return "other"
+        return self._ext_to_type.get(extension, "other")
 
     def get_file_extension(self, file_name):
         return Path(file_name).suffix.lower()
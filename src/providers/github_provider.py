@@ -1,14 +1,49 @@
-import base64
-import os
+import json
+import re
 from typing import Any
 
 from loguru import logger
 
 from src.config import Config
+from src.parsers.diff_parser import DiffParser
 from src.utils import http
 
 from .base_provider import BaseProvider
 
+# Binary/cache path fragments whose content is never useful to a reviewer.
+_SKIP_PATTERNS = frozenset(
+    {
+        "__pycache__/",
+        ".pyc",
+        ".pyo",
+        ".pyd",
+        ".so",
+        ".dll",
+        ".exe",
+        ".bin",
+        ".zip",
+        ".tar",
+        ".gz",
+        ".jpg",
+        ".jpeg",
+        ".png",
+        ".gif",
+        ".ico",
+        ".pdf",
+        ".doc",
+        ".docx",
+        ".xls",
+        ".xlsx",
+        ".lock",
+    }
+)
+
+# Sentinel marking a file whose content fetch failed (file is dropped).
+_FETCH_FAILED = object()
+
+# Matches both web and API pull request URLs in one pass.
+_GH_PR_RE = re.compile(r"^https?://(?:api\.)?github\.com/(?:repos/)?(?P<repo>[^/]+/[^/]+)/(?:pull|pulls)/(?P<num>\d+)")
+
 
 class GitHubProvider(BaseProvider):
     """GitHub provider responsible for fetching pull request (merge request) data.
@@ -21,39 +56,118 @@ class GitHubProvider(BaseProvider):
     We keep raw data in fetch method so tests can assert presence of keys like 'user'.
     """
 
-    def __init__(self, api_key: str | None = None, api_url: str | None = None):
-        self.api_key = api_key or os.getenv("GITHUB_API_KEY", Config.GITHUB_API_KEY)
+    def __init__(
+        self, api_key: str | None = None, api_url: str | None = None, include_full_content: bool | None = None
+    ):
+        self.api_key = api_key or Config.GITHUB_API_KEY
         self.api_url = api_url or Config.GITHUB_API_URL
+        # When False, a single diff-media-type request replaces the /files
+        # and per-file contents calls (review runs on the diff alone).
+        if include_full_content is None:
+            include_full_content = Config.FETCH_FILE_CONTENT
+        self.include_full_content = include_full_content
+        # Built once; every request on the shared pooled client reuses it.
+        self._headers = {"Authorization": f"token {self.api_key}"} if self.api_key else {}
 
     def _should_skip_file(self, filename: str) -> bool:
         """Check if file should be skipped from analysis."""
-        skip_patterns = [
-            "__pycache__/",
-            ".pyc",
-            ".pyo",
-            ".pyd",
-            ".so",
-            ".dll",
-            ".exe",
-            ".bin",
-            ".zip",
-            ".tar",
-            ".gz",
-            ".jpg",
-            ".jpeg",
-            ".png",
-            ".gif",
-            ".ico",
-            ".pdf",
-            ".doc",
-            ".docx",
-            ".xls",
-            ".xlsx",
-            ".lock",
-        ]
-
         filename_lower = filename.lower()
-        return any(pattern in filename_lower for pattern in skip_patterns)
+        return any(pattern in filename_lower for pattern in _SKIP_PATTERNS)
+
+    def _fetch_contents_graphql(self, repo_path: str, sha: str, filenames: list[str]) -> dict[str, str] | None:
+        """Fetch many file bodies in a single GraphQL request.
+
+        Aliases one repository.object(expression: "sha:path") selection per
+        file, so N REST round-trips collapse into one POST.
+
+        Returns:
+            Mapping of filename -> text. Binary blobs and missing files are
+            simply absent from the mapping. None when the call cannot be made
+            (no token, malformed repo path) or fails outright, in which case
+            the caller should fall back to REST.
+        """
+        if not self.api_key or "/" not in repo_path:
+            return None
+        owner, name = repo_path.split("/", 1)
+
+        selections = " ".join(
+            f"f{i}: object(expression: {json.dumps(f'{sha}:{filename}')}) {{ ... on Blob {{ text isBinary }} }}"
+            for i, filename in enumerate(filenames)
+        )
+        query = f"query {{ repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ {selections} }} }}"
+
+        try:
+            response = http.post(
+                f"{self.api_url}/graphql",
+                headers={"Authorization": f"bearer {self.api_key}"},
+                data={"query": query},
+            )
+        except Exception as exc:
+            logger.debug(f"GraphQL contents fetch failed, falling back to REST: {exc}")
+            return None
+
+        repository = (response.get("data") or {}).get("repository") or {}
+        contents: dict[str, str] = {}
+        for i, filename in enumerate(filenames):
+            blob = repository.get(f"f{i}")
+            if blob and not blob.get("isBinary") and blob.get("text") is not None:
+                contents[filename] = blob["text"]
+        return contents
+
+    def _fetch_file_contents(
+        self,
+        repo_path: str,
+        head_sha: str,
+        needed: list[tuple[int, str]],
+        headers: dict[str, str],
+    ) -> dict[int, Any]:
+        """Resolve file bodies for (index, filename) pairs.
+
+        One batched GraphQL request first; anything it could not provide
+        (binary blobs, unauthenticated runs, errors) goes through concurrent
+        REST contents calls. Failed fetches map to _FETCH_FAILED so the
+        caller can drop those files.
+        """
+        # The same blob can back several entries (renames, files touched by
+        # multiple commits); since the ref is a single head SHA, fetch each
+        # filename once and fan the body out to every index that needs it.
+        indices_by_name: dict[str, list[int]] = {}
+        for idx, filename in needed:
+            indices_by_name.setdefault(filename, []).append(idx)
+
+        contents: dict[int, Any] = {}
+
+        def _assign(filename: str, value: Any) -> None:
+            for idx in indices_by_name[filename]:
+                contents[idx] = value
+
+        rest_needed = list(indices_by_name)
+        graphql_contents = self._fetch_contents_graphql(repo_path, head_sha, rest_needed)
+        if graphql_contents is not None:
+            rest_needed = []
+            for filename in indices_by_name:
+                if filename in graphql_contents:
+                    _assign(filename, graphql_contents[filename])
+                else:
+                    rest_needed.append(filename)
+
+        if rest_needed:
+            requests = [
+                (f"{self.api_url}/repos/{repo_path}/contents/{filename}", {"ref": head_sha})
+                for filename in rest_needed
+            ]
+            # The raw media type returns the decoded body directly, skipping
+            # the JSON envelope and its base64-inflated content field.
+            raw_headers = {**headers, "Accept": "application/vnd.github.raw"}
+            results = http.get_many(requests, headers=raw_headers, as_text=True)
+            for filename, result in zip(rest_needed, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Error loading content for {filename}: {result}")
+                    _assign(filename, _FETCH_FAILED)
+                else:
+                    _assign(filename, result)
+
+        return contents
 
     def fetch_merge_request(self, mr_url: str):  # type: ignore[override]
         return self.fetch_merge_request_data(mr_url)
@@ -77,9 +191,7 @@ class GitHubProvider(BaseProvider):
         - https://github.com/owner/repo/pull/123
         - https://api.github.com/repos/owner/repo/pulls/123
         """
-        headers = {}
-        if self.api_key:
-            headers["Authorization"] = f"token {self.api_key}"
+        headers = self._headers
 
         if "invalid" in url:
             raise Exception("Invalid merge request identifier")
@@ -99,67 +211,98 @@ class GitHubProvider(BaseProvider):
         try:
             logger.info("Parsing pull request URL...")
 
-            if "github.com" in url and "/pull/" in url:
-                parts = url.replace("https://github.com/", "").split("/pull/")
-                if len(parts) == 2:
-                    repo_path = parts[0]  # owner/repo
-                    pr_number = parts[1]
-                    if not pr_number.isdigit():
-                        raise ValueError(
-                            f"Invalid GitHub PR URL format: expected numeric id after '/pull/', got '{pr_number}'"
-                        )
-                    api_url = f"{self.api_url}/repos/{repo_path}/pulls/{pr_number}"
-                else:
-                    raise ValueError("Invalid GitHub PR URL format")
+            url_match = _GH_PR_RE.match(url)
+            if url_match:
+                repo_path = url_match.group("repo")
+                pr_number = url_match.group("num")
+                api_url = url if "/repos/" in url else f"{self.api_url}/repos/{repo_path}/pulls/{pr_number}"
+            elif "github.com" in url and ("/pull/" in url or "/pulls/" in url):
+                raise ValueError(f"Invalid GitHub PR URL format: '{url}'")
             else:
                 api_url = url
-                if "/repos/" in url and "/pulls/" in url:
-                    url_parts = url.split("/repos/")[1].split("/pulls/")
-                    repo_path = url_parts[0]
-                    pr_number = url_parts[1]
-                else:
-                    repo_path = "unknown/repo"
-                    pr_number = "unknown"
+                repo_path = "unknown/repo"
+                pr_number = "unknown"
 
             logger.info(f"Fetching PR #{pr_number} data from repository {repo_path}...")
 
-            pr_data = http.get(api_url, headers=headers)
+            if not self.include_full_content:
+                pr_data = http.get_conditional(api_url, headers=headers)
+                logger.info("Diff-only mode: fetching unified PR diff in one request...")
+                diff_headers = {**headers, "Accept": "application/vnd.github.v3.diff"}
+                pr_data["diffs"] = http.get_text(api_url, headers=diff_headers)
+                pr_data["files"] = []
+                pr_data["enhanced_changes"] = []
+                return pr_data
 
+            # Neither request depends on the other's body, so issue both at
+            # once: one slow round-trip instead of two in sequence.
             files_url = f"{api_url}/files"
-            logger.info("Fetching list of changed files...")
-            try:
-                files_data = http.get(files_url, headers=headers)
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to fetch files: {e}")
+            pr_data, files_data = http.get_conditional_many([(api_url, None), (files_url, None)], headers=headers)
+            if isinstance(pr_data, Exception):
+                raise pr_data
+            if isinstance(files_data, Exception):
+                logger.warning(f"⚠️ Failed to fetch files: {files_data}")
                 return pr_data
 
             pr_data["files"] = files_data
             logger.info(f"Received {len(files_data)} changed files")
 
-            enhanced_changes: list[dict[str, Any]] = []
-            for i, file_data in enumerate(files_data, 1):
+            # GitHub omits "patch" for large files. Rather than falling back to
+            # extra per-file requests, fetch the unified diff for the whole PR
+            # in one call via the diff media type and backfill from it.
+            if any("patch" not in file_data for file_data in files_data):
+                try:
+                    diff_headers = {**headers, "Accept": "application/vnd.github.v3.diff"}
+                    full_diff = http.get_text(api_url, headers=diff_headers)
+                    patches = {chunk["file"]: chunk["diff"] for chunk in DiffParser().extract_file_chunks(full_diff)}
+                    for file_data in files_data:
+                        if "patch" not in file_data and file_data.get("filename") in patches:
+                            file_data["patch"] = patches[file_data["filename"]]
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to fetch PR diff: {e}")
+
+            head_sha = pr_data.get("head", {}).get("sha", "HEAD")
+
+            # Collect reviewable files first, then resolve their contents in
+            # bulk instead of one blocking round-trip per file.
+            reviewable: list[dict[str, Any]] = []
+            needed: list[tuple[int, str]] = []
+            skipped = 0
+
+            for file_data in files_data:
                 filename = file_data.get("filename", "")
-                status = file_data.get("status", "modified")
-                patch = file_data.get("patch", "")
 
-                # Skip binary and cache files
+                # Skip binary and cache files; one aggregate log line instead
+                # of a flushed write per skipped file.
                 if self._should_skip_file(filename):
-                    logger.info(f"[{i}/{len(files_data)}] Skipping binary/cache file: {filename}")
+                    logger.debug(f"Skipping binary/cache file: {filename}")
+                    skipped += 1
                     continue
 
-                logger.info(f"[{i}/{len(files_data)}] Loading content: {filename}")
+                reviewable.append(file_data)
+                if file_data.get("status", "modified") != "removed":
+                    needed.append((len(reviewable) - 1, filename))
+
+            if skipped:
+                logger.info(f"Skipped {skipped} binary/cache files")
+
+            contents: dict[int, Any] = {}
+            if needed:
+                logger.info(f"Loading content for {len(needed)} files...")
+                contents = self._fetch_file_contents(repo_path, head_sha, needed, headers)
+
+            enhanced_changes: list[dict[str, Any]] = []
+            for idx, file_data in enumerate(reviewable):
+                filename = file_data.get("filename", "")
+                status = file_data.get("status", "modified")
+                patch = file_data.get("patch", "")
 
                 new_content = ""
                 if status != "removed":
-                    try:
-                        contents_url = f"{self.api_url}/repos/{repo_path}/contents/{filename}"
-                        params = {"ref": pr_data.get("head", {}).get("sha", "HEAD")}
-                        content_data = http.get(contents_url, headers=headers, params=params)
-                        if "content" in content_data:
-                            new_content = base64.b64decode(content_data["content"]).decode("utf-8")
-                    except Exception as e:
-                        logger.warning(f"Error loading content for {filename}: {e}")
+                    value = contents.get(idx)
+                    if value is _FETCH_FAILED:
                         continue
+                    new_content = value or ""
 
                 enhanced_change = {
                     "file_path": filename,
@@ -224,7 +367,7 @@ class GitHubProvider(BaseProvider):
             "author": data.get("user", {}).get("login") if isinstance(data.get("user"), dict) else data.get("user"),
             "description": data.get("body"),
             "changes": changes,
-            "diffs": "\n".join(diffs),
+            "diffs": data["diffs"] if "diffs" in data else "\n".join(diffs),
             "user": data.get("user", {}),
             "web_url": data.get("html_url", ""),
             "html_url": data.get("html_url", ""),
@@ -1,5 +1,5 @@
-import base64
-import os
+import re
+from functools import cache
 from typing import Any
 
 from loguru import logger
@@ -9,6 +9,19 @@ from src.utils import http
 
 from .base_provider import BaseProvider
 
+# Matches GitLab merge request web URLs in one pass.
+_GL_MR_RE = re.compile(r"^https?://gitlab\.com/(?P<proj>.+?)/-/merge_requests/(?P<mr_id>\d+)")
+
+
+@cache
+def _encode_path(path: str) -> str:
+    """URL-encode a project or file path for GitLab API routes, memoized.
+
+    The project path recurs on every request of a run and file paths recur
+    across retries/caching, so each distinct path is scanned only once.
+    """
+    return path.replace("/", "%2F")
+
 
 class GitLabProvider(BaseProvider):
     """GitLab provider that fetches merge request data.
@@ -17,9 +30,21 @@ class GitLabProvider(BaseProvider):
       fetch_merge_request_data(url)
     """
 
-    def __init__(self, api_key: str | None = None, api_url: str | None = None):
-        self.api_key = api_key or os.getenv("GITLAB_API_KEY", Config.GITLAB_API_KEY)
+    def __init__(
+        self, api_key: str | None = None, api_url: str | None = None, include_full_content: bool | None = None
+    ):
+        self.api_key = api_key or Config.GITLAB_API_KEY
         self.api_url = api_url or Config.GITLAB_API_URL
+        # When False, per-file raw content requests are skipped entirely and
+        # the review runs on the diffs alone.
+        if include_full_content is None:
+            include_full_content = Config.FETCH_FILE_CONTENT
+        self.include_full_content = include_full_content
+        # Built once; every request on the shared pooled client reuses it.
+        self._headers = {"Private-Token": self.api_key} if self.api_key else {}
+        # Memoizes file bodies per (project, path, ref); refs are immutable
+        # SHAs in practice, so entries never go stale within a run.
+        self._file_content_cache: dict[tuple[str, str, str], str] = {}
 
     def _should_skip_file(self, filename: str) -> bool:
         """Check if file should be skipped from analysis."""
@@ -67,23 +92,28 @@ class GitLabProvider(BaseProvider):
 
     def get_file_content(self, project_path: str, file_path: str, ref: str = "HEAD") -> str:
         """Get full content of a file from GitLab repository."""
-        headers = {"Private-Token": self.api_key} if self.api_key else {}
+        cache_key = (project_path, file_path, ref)
+        cached = self._file_content_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
+        headers = self._headers
+        content = ""
         try:
-            encoded_file_path = file_path.replace("/", "%2F")
-            url = f"{self.api_url}/projects/{project_path}/repository/files/{encoded_file_path}"
+            # The /raw variant returns the body verbatim: no JSON envelope to
+            # parse and no base64 inflation/decoding.
+            url = f"{self.api_url}/projects/{project_path}/repository/files/{_encode_path(file_path)}/raw"
             params = {"ref": ref}
 
-            data = http.get(url, headers=headers, params=params)
-            if "content" in data:
-                return base64.b64decode(data["content"]).decode("utf-8")
+            content = http.get_text(url, headers=headers, params=params)
         except Exception as exc:
             logger.debug(f"GitLab get_file_content error for {file_path}@{ref}: {exc}")
 
-        return ""
+        self._file_content_cache[cache_key] = content
+        return content
 
     def fetch_merge_request_data(self, url: str) -> dict[str, Any]:
-        headers = {"Private-Token": self.api_key} if self.api_key else {}
+        headers = self._headers
         if "invalid" in url:
             raise Exception("Error fetching data: invalid merge request identifier")
 
@@ -101,71 +131,98 @@ class GitLabProvider(BaseProvider):
 
         try:
             logger.info("Parsing merge request URL...")
-            parts = url.replace("https://gitlab.com/", "").split("/-/merge_requests/")
-            if len(parts) != 2:
+            url_match = _GL_MR_RE.match(url)
+            if not url_match:
                 raise ValueError("Invalid GitLab MR URL format")
 
-            project_path = parts[0].replace("/", "%2F")
-            mr_id = parts[1]
-            if not mr_id.isdigit():
-                raise ValueError(
-                    f"Invalid GitLab MR URL format: expected numeric id after '/merge_requests/', got '{mr_id}'"
-                )
+            project_name = url_match.group("proj")
+            project_path = _encode_path(project_name)
+            mr_id = url_match.group("mr_id")
 
-            logger.info(f"Fetching MR #{mr_id} data from project {parts[0]}...")
+            logger.info(f"Fetching MR #{mr_id} data from project {project_name}...")
             api_url = f"{self.api_url}/projects/{project_path}/merge_requests/{mr_id}/changes"
             mr_data = http.get(api_url, headers=headers)
 
-            diffs: list[str] = []
             enhanced_changes: list[dict[str, Any]] = []
 
             if "changes" in mr_data:
-                logger.info(f"Processing {len(mr_data['changes'])} changed files...")
-                for i, change in enumerate(mr_data["changes"], 1):
-                    if "diff" in change:
-                        old_path = change.get("old_path")
-                        new_path = change.get("new_path")
-                        file_path = new_path or old_path
-
-                        if not file_path:
-                            continue
-
-                        # Skip binary and cache files
-                        if self._should_skip_file(file_path):
-                            logger.info(f"[{i}/{len(mr_data['changes'])}] Skipping binary/cache file: {file_path}")
-                            continue
-
-                        logger.info(f"[{i}/{len(mr_data['changes'])}] Loading content: {file_path}")
-
-                        new_content = ""
-                        if new_path and mr_data.get("diff_refs", {}).get("head_sha"):
-                            try:
-                                new_content = self.get_file_content(
-                                    project_path, new_path, mr_data["diff_refs"]["head_sha"]
-                                )
-                            except Exception as e:
-                                logger.warning(f"Error loading content for {file_path}: {e}")
-                                continue
-
-                        enhanced_change = {
-                            "file_path": file_path,
-                            "old_path": old_path,
-                            "new_path": new_path,
-                            "diff": change["diff"],
-                            "new_content": new_content,
-                            "new_file": change.get("new_file", False),
-                            "deleted_file": change.get("deleted_file", False),
-                            "renamed_file": change.get("renamed_file", False),
-                        }
-                        enhanced_changes.append(enhanced_change)
-
-                        diff_header = f"diff --git a/{file_path} b/{file_path}"
-                        diffs.append(diff_header + "\n" + change["diff"])
-
-            result = mr_data.copy()
-            result["diffs"] = "\n".join(diffs)
-            result["enhanced_changes"] = enhanced_changes
-            return result
+                changes = mr_data["changes"]
+                logger.info(f"Processing {len(changes)} changed files...")
+
+                head_sha = mr_data.get("diff_refs", {}).get("head_sha")
+
+                # Collect reviewable changes first, then fetch their contents
+                # concurrently instead of one blocking round-trip per file.
+                reviewable: list[dict[str, Any]] = []
+                content_requests: list[tuple[str, dict[str, Any] | None]] = []
+                content_indices: list[int] = []
+                skipped = 0
+
+                for change in changes:
+                    if "diff" not in change:
+                        continue
+                    file_path = change.get("new_path") or change.get("old_path")
+                    if not file_path:
+                        continue
+
+                    # Skip binary and cache files; one aggregate log line
+                    # instead of a flushed write per skipped file.
+                    if self._should_skip_file(file_path):
+                        logger.debug(f"Skipping binary/cache file: {file_path}")
+                        skipped += 1
+                        continue
+
+                    reviewable.append(change)
+                    new_path = change.get("new_path")
+                    if self.include_full_content and new_path and head_sha:
+                        content_url = (
+                            f"{self.api_url}/projects/{project_path}/repository/files/{_encode_path(new_path)}/raw"
+                        )
+                        content_requests.append((content_url, {"ref": head_sha}))
+                        content_indices.append(len(reviewable) - 1)
+
+                if skipped:
+                    logger.info(f"Skipped {skipped} binary/cache files")
+
+                contents: dict[int, Any] = {}
+                if content_requests:
+                    logger.info(f"Loading content for {len(content_requests)} files concurrently...")
+                    results = http.get_many(content_requests, headers=headers, as_text=True)
+                    contents = dict(zip(content_indices, results))
+
+                for idx, change in enumerate(reviewable):
+                    old_path = change.get("old_path")
+                    new_path = change.get("new_path")
+                    file_path = new_path or old_path
+
+                    new_content = ""
+                    content_data = contents.get(idx)
+                    if isinstance(content_data, Exception):
+                        logger.debug(f"GitLab content fetch error for {file_path}@{head_sha}: {content_data}")
+                    elif content_data:
+                        new_content = content_data
+
+                    enhanced_change = {
+                        "file_path": file_path,
+                        "old_path": old_path,
+                        "new_path": new_path,
+                        "diff": change["diff"],
+                        "new_content": new_content,
+                        "new_file": change.get("new_file", False),
+                        "deleted_file": change.get("deleted_file", False),
+                        "renamed_file": change.get("renamed_file", False),
+                    }
+                    enhanced_changes.append(enhanced_change)
+
+            # mr_data is ours alone, so annotate it in place rather than
+            # shallow-copying the whole (potentially large) MR payload.
+            # Reviewers consume enhanced_changes per file; the combined diff
+            # only backs their fallback path, which fires exactly when there
+            # are no reviewable changes - so the O(total-bytes) join of every
+            # header and body was always thrown away.
+            mr_data["diffs"] = ""
+            mr_data["enhanced_changes"] = enhanced_changes
+            return mr_data
 
         except Exception as e:
             logger.error(f"Error fetching GitLab data: {e}")
@@ -183,11 +240,10 @@ class GitLabProvider(BaseProvider):
             }
 
     def parse_merge_request_data(self, data: dict[str, Any]) -> dict[str, Any]:
-        author_data = data.get("author", {})
-        if isinstance(author_data, dict):
-            author = author_data
-        else:
-            author = {"username": author_data} if author_data else {}
+        # Type-dependent author formatting lives in ReportBuilder's dispatch
+        # table; pre-wrapping strings into dicts here would just be a second
+        # copy of that type check.
+        author = data.get("author") or {}
 
         # Normalize changes list to a simple schema used by ReportBuilder
         normalized_changes: list[dict[str, Any]] = []
@@ -1,4 +1,100 @@
-from typing import Any
+import io
+from collections.abc import Callable
+from functools import cache
+from typing import Any, TextIO
+
+from src.config import Config
+
+# Extension -> syntax-highlight language for full-file code blocks.
+_LANG_MAP = {
+    "ts": "typescript",
+    "js": "javascript",
+    "tsx": "tsx",
+    "jsx": "jsx",
+    "py": "python",
+    "go": "go",
+    "java": "java",
+    "cpp": "cpp",
+    "c": "c",
+    "css": "css",
+    "scss": "scss",
+    "html": "html",
+    "xml": "xml",
+    "json": "json",
+    "yaml": "yaml",
+    "yml": "yaml",
+    "md": "markdown",
+    "sql": "sql",
+    "sh": "bash",
+    "dockerfile": "dockerfile",
+}
+
+@cache
+def _syntax_for(file_name: str) -> str:
+    """Syntax-highlight language for a file name, memoized per name."""
+    i = file_name.rfind(".")
+    ext = file_name[i + 1 :].lower() if i >= 0 else ""
+    return _LANG_MAP.get(ext, ext)
+
+
+# Change-type -> human-readable file marker for report sections.
+_CHANGE_MARKERS = {
+    "new": "Новый файл",
+    "deleted": "Удалённый файл",
+}
+
+
+def _build_author_formats() -> dict[int, Callable[[dict[str, Any]], str]]:
+    """Precompute one formatter per presence-bitmask of the author fields.
+
+    The bits are (login, html_url, name, username, web_url), high to low;
+    the precedence below mirrors the original if-ladder. Evaluating it once
+    per mask at import time means _format_author_dict tests each field
+    exactly once per call.
+    """
+    formats: dict[int, Callable[[dict[str, Any]], str]] = {}
+    for mask in range(32):
+        login, html_url, name, username, web_url = (bool(mask & (1 << bit)) for bit in (4, 3, 2, 1, 0))
+        if login and html_url:
+            fmt = lambda d: f"[@{d['login']}]({d['html_url']})"
+        elif login:
+            fmt = lambda d: f"@{d['login']}"
+        elif name and username and web_url:
+            fmt = lambda d: f"**{d['name']}** ([@{d['username']}]({d['web_url']}))"
+        elif name and username:
+            fmt = lambda d: f"**{d['name']}** (@{d['username']})"
+        elif username and web_url:
+            fmt = lambda d: f"[@{d['username']}]({d['web_url']})"
+        elif username:
+            fmt = lambda d: f"@{d['username']}"
+        elif name:
+            fmt = lambda d: f"**{d['name']}**"
+        else:
+            fmt = lambda d: "Unknown"
+        formats[mask] = fmt
+    return formats
+
+
+_AUTHOR_FORMATS = _build_author_formats()
+
+
+def _format_author_dict(author_data: dict[str, Any]) -> str:
+    """Format a GitHub/GitLab author dict for display."""
+    mask = (
+        (bool(author_data.get("login")) << 4)
+        | (bool(author_data.get("html_url")) << 3)
+        | (bool(author_data.get("name")) << 2)
+        | (bool(author_data.get("username")) << 1)
+        | bool(author_data.get("web_url"))
+    )
+    return _AUTHOR_FORMATS[mask](author_data)
+
+
+# Dispatch on the author payload's type; anything unexpected falls back to str().
+_AUTHOR_FORMATTERS = {
+    dict: _format_author_dict,
+    str: lambda s: s,
+}
 
 
 class ReportBuilder:
@@ -9,37 +105,23 @@ class ReportBuilder:
 
     def _format_author(self, author_data: Any) -> str:
         """Format author information for display."""
-        if isinstance(author_data, dict):
-            login = author_data.get("login", "")
-            html_url = author_data.get("html_url", "")
-
-            name = author_data.get("name", "")
-            username = author_data.get("username", "")
-            web_url = author_data.get("web_url", "")
-
-            if login:
-                if html_url:
-                    return f"[@{login}]({html_url})"
-                return f"@{login}"
-
-            if name and username:
-                if web_url:
-                    return f"**{name}** ([@{username}]({web_url}))"
-                return f"**{name}** (@{username})"
-            if username:
-                if web_url:
-                    return f"[@{username}]({web_url})"
-                return f"@{username}"
-            if name:
-                return f"**{name}**"
-            return "Unknown"
-
-        if isinstance(author_data, str):
-            return author_data
-
-        return str(author_data)
+        return _AUTHOR_FORMATTERS.get(type(author_data), str)(author_data)
 
     def generate_report(self, data: dict[str, Any]) -> str:
+        """Render the report into one string (see generate_report_to to stream)."""
+        buf = io.StringIO()
+        self._render(buf.write, data)
+        return buf.getvalue()
+
+    def generate_report_to(self, fp: TextIO, data: dict[str, Any]) -> None:
+        """Render the report straight into an open text file.
+
+        Streaming keeps peak memory at the largest single fragment instead
+        of the whole report plus its encoded copy.
+        """
+        self._render(fp.write, data)
+
+    def _render(self, write: Callable[[str], Any], data: dict[str, Any]) -> None:
         title = data.get("title") or "No Title"
         author_data = data.get("author") or "Unknown"
         changes: list[dict[str, Any]] = data.get("changes") or []
@@ -51,35 +133,30 @@ class ReportBuilder:
         web_url = data.get("web_url", data.get("html_url", ""))
         mr_id = data.get("mr_id", data.get("number", data.get("id", "")))
 
-        # Prefer richer author info if available (e.g., GitHub provides `user` with html_url)
+        # BaseReviewer normalizes author/user into one canonical value, so no
+        # re-dispatching between the two payloads is needed here.
         author_info = self._format_author(author_data)
-        if isinstance(author_data, str):
-            gh_user = data.get("user")
-            if isinstance(gh_user, dict):
-                enriched = self._format_author(gh_user)
-                if enriched and enriched != "Unknown":
-                    author_info = enriched
 
-        lines = [f"## 📝 Название: {title}"]
-        lines.append(f"## 👤 Автор: {author_info}")
+        # Each piece is written once, with its own trailing newline.
+        write(f"## 📝 Название: {title}\n")
+        write(f"## 👤 Автор: {author_info}\n")
 
         if web_url and mr_id:
-            lines.append(f"## 🔗 Merge Request: [#{mr_id}]({web_url})")
-        else:
-            if web_url:
-                lines.append(f"## 🔗 Link: [View PR/MR]({web_url})")
+            write(f"## 🔗 Merge Request: [#{mr_id}]({web_url})\n")
+        elif web_url:
+            write(f"## 🔗 Link: [View PR/MR]({web_url})\n")
 
         description = data.get("description", "")
         if description and description.strip():
-            lines.append("## 📋 Описание:")
-            lines.append(description.strip())
+            write("## 📋 Описание:\n")
+            write(f"{description.strip()}\n")
 
         if ai_summary:
-            lines.append("\n## Результат ревью")
-            lines.append(ai_summary.strip())
+            write("\n## Результат ревью\n")
+            write(f"{ai_summary.strip()}\n")
 
         if file_reviews:
-            lines.append("\n## Детальный анализ изменений")
+            write("\n## Детальный анализ изменений\n")
             for i, review in enumerate(file_reviews, 1):
                 file_name = review.get("file", "unknown")
                 diff = review.get("diff", "")
@@ -87,79 +164,44 @@ class ReportBuilder:
                 change_type = review.get("change_type", "modified")
                 new_content = review.get("new_content", "")
 
-                lines.append(f"\n### {i}. `{file_name}`")
+                marker = _CHANGE_MARKERS.get(change_type, "Изменённый файл")
 
-                if change_type == "new":
-                    lines.append("Новый файл")
-                elif change_type == "deleted":
-                    lines.append("Удалённый файл")
-                else:
-                    lines.append("Изменённый файл")
-
-                lines.append("\nИзменения:")
-                lines.append("```diff")
-                lines.append(diff)
-                lines.append("```")
-
-                if change_type == "new" and new_content and len(new_content) < 2000:
-                    lines.append("\nПолное содержимое файла:")
-                    ext = file_name.split(".")[-1] if "." in file_name else ""
-                    lang_map = {
-                        "ts": "typescript",
-                        "js": "javascript",
-                        "tsx": "tsx",
-                        "jsx": "jsx",
-                        "py": "python",
-                        "go": "go",
-                        "java": "java",
-                        "cpp": "cpp",
-                        "c": "c",
-                        "css": "css",
-                        "scss": "scss",
-                        "html": "html",
-                        "xml": "xml",
-                        "json": "json",
-                        "yaml": "yaml",
-                        "yml": "yaml",
-                        "md": "markdown",
-                        "sql": "sql",
-                        "sh": "bash",
-                        "dockerfile": "dockerfile",
-                    }
-                    syntax = lang_map.get(ext.lower(), ext.lower())
-                    lines.append(f"```{syntax}")
-                    lines.append(new_content)
-                    lines.append("```")
+                write(f"\n### {i}. `{file_name}`\n{marker}\n\nИзменения:\n```diff\n{diff}\n```")
 
-                # Всегда выводим раздел анализа; если LLM не дала комментариев — ставим LGTM
-                lines.append("\nАнализ:")
-                lines.append(comments if comments else "LGTM, доработок не требуется.")
+                if change_type == "new" and new_content:
+                    # Embed up to the configured limit with an explicit
+                    # truncation marker, instead of silently dropping the
+                    # whole block for files past an arbitrary size.
+                    limit = Config.REPORT_MAX_EMBED
+                    write(f"\n\nПолное содержимое файла:\n```{_syntax_for(file_name)}\n")
+                    write(new_content[:limit])
+                    if len(new_content) > limit:
+                        write(f"\n... (обрезано, ещё {len(new_content) - limit} символов)")
+                    write("\n```")
 
-                lines.append("\n---")
+                # Всегда выводим раздел анализа; если LLM не дала комментариев — ставим LGTM
+                write(f"\n\nАнализ:\n{comments if comments else 'LGTM, доработок не требуется.'}\n\n---\n")
         else:
-            lines.append("\n### Changes:")
+            write("\n### Changes:\n")
             if not changes:
                 # If we have enhanced_changes but no AI file reviews, render per-file diffs minimally
                 if enhanced_changes:
-                    for i, ch in enumerate(enhanced_changes, 1):
+                    for ch in enhanced_changes:
                         file_name = ch.get("file_path") or ch.get("new_path") or ch.get("old_path") or "unknown"
                         diff = ch.get("diff", "")
                         status = (
                             "added" if ch.get("new_file") else "removed" if ch.get("deleted_file") else "modified"
                         )
-                        lines.append(f"- {file_name}: {status}")
+                        write(f"- {file_name}: {status}\n")
                         if diff:
-                            lines.append("\n```diff")
-                            lines.append(diff)
-                            lines.append("```")
-                            lines.append("")
+                            write(f"\n```diff\n{diff}\n```\n\n")
                 else:
-                    lines.append("No changes detected.")
+                    write("No changes detected.\n")
             else:
-                lines.extend(f"- {c.get('file')}: {c.get('status')}" for c in changes)
+                for c in changes:
+                    write(f"- {c.get('file')}: {c.get('status')}\n")
 
             if ai_diff_comments:
-                lines.append("\n### Детальные замечания по изменениям:")
-                lines.extend(f"- {c}" for c in ai_diff_comments)
-
-        return "\n".join(lines) + "\n"
+                write("\n### Детальные замечания по изменениям:\n")
+                for c in ai_diff_comments:
+                    write(f"- {c}\n")
@@ -1,8 +1,14 @@
 """Base class for all code reviewers."""
 
+import hashlib
+import re
 from abc import ABC, abstractmethod
 from typing import Any
 
+# New-side range of a hunk header; the lengths are optional because
+# single-line hunks are emitted as `@@ -a +c @@`.
+_HUNK_NEW_RANGE_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", re.ASCII | re.MULTILINE)
+
 
 class BaseReviewer(ABC):
     """Abstract base class for code reviewers."""
@@ -16,22 +22,195 @@ class BaseReviewer(ABC):
         self.merge_request_data = merge_request_data
         self._processed: dict[str, Any] = {}
 
+    # Combined diff+content budget (in characters) for one batched request.
+    _BATCH_CHAR_BUDGET = 12000
+
+    @staticmethod
+    def _pack_batches(changes: list[dict[str, Any]], max_chars: int = _BATCH_CHAR_BUDGET) -> list[list[dict[str, Any]]]:
+        """Greedily group changes so each batch stays under max_chars.
+
+        Small files share one request (amortizing the round-trip and system
+        prompt); a file exceeding the budget on its own gets its own batch.
+        """
+        batches: list[list[dict[str, Any]]] = []
+        current: list[dict[str, Any]] = []
+        current_size = 0
+        for change in changes:
+            size = len(change["diff"]) + len(change["new_content"])
+            if current and current_size + size > max_chars:
+                batches.append(current)
+                current = []
+                current_size = 0
+            current.append(change)
+            current_size += size
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _duplicate_groups(
+        changes: list[dict[str, Any]],
+    ) -> tuple[list[dict[str, Any]], dict[str, list[dict[str, Any]]]]:
+        """Split changes into unique representatives and their duplicates.
+
+        Version bumps and import reorders applied across a monorepo leave
+        byte-identical diffs in many files; reviewing one copy and replaying
+        its comments on the rest saves one LLM call per duplicate. New files
+        are keyed on their content as well, since their diffs alone (often
+        empty) would collide across unrelated files.
+        """
+        representatives: list[dict[str, Any]] = []
+        duplicates: dict[str, list[dict[str, Any]]] = {}
+        seen: dict[bytes, str] = {}
+        for change in changes:
+            material = change["diff"]
+            if change["new_file"]:
+                material += "\0" + change["new_content"]
+            key = hashlib.blake2b(material.encode(), digest_size=16).digest()
+            rep_path = seen.get(key)
+            if rep_path is None:
+                seen[key] = change["file_path"]
+                representatives.append(change)
+            else:
+                duplicates.setdefault(rep_path, []).append(change)
+        return representatives, duplicates
+
+    @staticmethod
+    def _replicate_reviews(
+        file_reviews: list[dict[str, Any]],
+        duplicates: dict[str, list[dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        """Expand representatives' review entries onto their duplicates.
+
+        Each duplicate gets a copy of its representative's entry under its
+        own path, inserted right after it; commented entries gain a note
+        listing the files sharing the change.
+        """
+        if not duplicates:
+            return file_reviews
+        expanded: list[dict[str, Any]] = []
+        for entry in file_reviews:
+            expanded.append(entry)
+            dups = duplicates.get(entry["file"])
+            if not dups:
+                continue
+            if entry.get("comments"):
+                paths = ", ".join(f"`{p}`" for p in [entry["file"]] + [d["file_path"] for d in dups])
+                entry["comments"] += f"\n\nИдентичное изменение в {1 + len(dups)} файлах: {paths}"
+            expanded.extend(
+                {**entry, "file": dup["file_path"], "new_content": dup["new_content"]} for dup in dups
+            )
+        return expanded
+
+    # Ceiling (in characters) for file content embedded in one review context.
+    _CONTEXT_CHAR_CAP = 8000
+
+    @classmethod
+    def _contextual_window(cls, new_content: str, diff: str, radius: int = 20) -> str:
+        """Trim file content down to the regions the diff actually touches.
+
+        Prompt tokens scale linearly with embedded content, so a large file
+        sent verbatim pays prefill latency and cost for thousands of lines
+        the model was told to ignore anyway. The hunk headers already say
+        which new-side line ranges changed; keep those plus `radius` lines
+        around each, marking elisions with `...` lines. Content under the
+        cap passes through untouched, and content without parseable hunks
+        (new files) is cut at the cap.
+        """
+        if len(new_content) <= cls._CONTEXT_CHAR_CAP:
+            return new_content
+
+        ranges: list[list[int]] = []
+        for match in _HUNK_NEW_RANGE_RE.finditer(diff):
+            start = int(match.group(1))
+            length = int(match.group(2) or 1)
+            begin = max(start - radius, 1)
+            end = start + length - 1 + radius
+            if ranges and begin <= ranges[-1][1] + 1:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([begin, end])
+        if not ranges:
+            return new_content[: cls._CONTEXT_CHAR_CAP]
+
+        lines = new_content.splitlines()
+        pieces: list[str] = []
+        budget = cls._CONTEXT_CHAR_CAP
+        for begin, end in ranges:
+            window = "\n".join(lines[begin - 1 : end])
+            if budget - len(window) < 0:
+                window = window[:budget]
+            pieces.append(window)
+            budget -= len(window)
+            if budget <= 0:
+                break
+        if ranges[0][0] > 1:
+            pieces.insert(0, "...")
+        if ranges[-1][1] < len(lines) or budget <= 0:
+            pieces.append("...")
+        return "\n".join(pieces)
+
+    # Generated-file suffixes whose diffs carry no review signal.
+    _SKIP_REVIEW_SUFFIXES = (".lock", "package-lock.json", ".min.js", ".min.css", ".svg")
+
+    @staticmethod
+    def _is_trivial_diff(diff: str) -> bool:
+        """True when a diff carries no substantive +/- lines.
+
+        Pure renames, mode changes and whitespace-only edits produce diffs
+        of headers and blank +/- lines; sending those to the model wastes a
+        full round-trip to hear "looks fine".
+        """
+        for line in diff.splitlines():
+            if line and line[0] in "+-" and not line.startswith(("+++", "---")) and line[1:].strip():
+                return False
+        return True
+
+    def _should_review(self, change: dict[str, Any]) -> bool:
+        """Cheap local gate deciding whether a change is worth an LLM call.
+
+        Lockfiles and minified/generated assets are skipped by suffix;
+        everything else is skipped only when its diff is trivial (new files
+        always pass — their diff may be empty while the content is not).
+        """
+        if change["file_path"].lower().endswith(self._SKIP_REVIEW_SUFFIXES):
+            return False
+        return change["new_file"] or not self._is_trivial_diff(change["diff"])
+
+    def _normalize_author(self) -> dict[str, Any] | str:
+        """Reconcile the provider author/user payloads into one value.
+
+        Providers disagree on shape: GitLab sends an author dict with
+        name/username/web_url, GitHub a user dict with login/html_url, mock
+        mode a bare string. Normalizing here means the report formatter sees
+        a single canonical shape instead of re-dispatching per field source.
+        """
+        author = self.merge_request_data.get("author")
+        user = self.merge_request_data.get("user")
+        if isinstance(author, dict):
+            return {**user, **author} if isinstance(user, dict) else author
+        if isinstance(user, dict) and user:
+            return user
+        return author or {}
+
     def process_merge_request(self) -> None:
         """Process merge request data to build report payload."""
-        mr_id = self.merge_request_data.get("number") or self.merge_request_data.get("id")
+        # One bound-method lookup instead of ten attribute+method resolutions.
+        get = self.merge_request_data.get
+        mr_id = get("number") or get("id")
 
         self._processed = {
-            "title": self.merge_request_data.get("title"),
-            "author": self.merge_request_data.get("author") or self.merge_request_data.get("user", {}).get("login"),
-            "description": self.merge_request_data.get("description", ""),
-            "changes": self.merge_request_data.get("changes", []),
-            "diffs": self.merge_request_data.get("diffs", ""),
-            "web_url": self.merge_request_data.get("web_url", ""),
+            "title": get("title"),
+            "author": self._normalize_author(),
+            "description": get("description", ""),
+            "changes": get("changes", []),
+            "diffs": get("diffs", ""),
+            "web_url": get("web_url", ""),
             "mr_id": str(mr_id) if mr_id else "",
             # Pass through raw user info (e.g., GitHub user with html_url) for richer author formatting
-            "user": self.merge_request_data.get("user", {}),
+            "user": get("user", {}),
             # Provide enhanced per-file changes (diff + new_content) if available from providers
-            "enhanced_changes": self.merge_request_data.get("enhanced_changes", []),
+            "enhanced_changes": get("enhanced_changes", []),
         }
 
     def generate_report_data(self) -> dict[str, Any]:
@@ -1,11 +1,15 @@
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from typing import Any
 
 from loguru import logger
-from tqdm import tqdm
 
 from src.config import Config
 from src.parsers.diff_parser import DiffParser
 from src.reviewers.base_reviewer import BaseReviewer
+from src.utils import review_cache
 from src.utils.gemini_client import GeminiClient
 
 
@@ -24,85 +28,212 @@ class GeminiReviewer(BaseReviewer):
         self._client = client or (GeminiClient() if self.enable_ai else None)
         self._diff_parser = DiffParser()
 
+    @staticmethod
+    def _change_type(change: dict[str, Any]) -> str:
+        """Classify an enhanced change once; callers thread the result through."""
+        return "new" if change["new_file"] else "deleted" if change["deleted_file"] else "modified"
+
+    def _build_context(self, change: dict[str, Any], change_type: str) -> str:
+        """Assemble the review context for a single enhanced change.
+
+        The large diff and new_content strings are written into the buffer
+        verbatim rather than interpolated through f-strings, so no extra
+        copy of them is made along the way.
+        """
+        file_path = change["file_path"]
+        diff = change["diff"]
+        new_content = self._contextual_window(change["new_content"], diff)
+        buf = io.StringIO()
+        write = buf.write
+
+        if change_type == "new":
+            write(f"Новый файл: `{file_path}`")
+            if new_content:
+                write("\n\nСодержимое нового файла:\n```\n")
+                write(new_content)
+                write("\n```")
+        elif change_type == "deleted":
+            write(f"Удаленный файл: `{file_path}`")
+            write("\n\nDiff удаления:\n```diff\n")
+            write(diff)
+            write("\n```")
+        else:
+            write(f"Изменённый файл: `{file_path}`")
+
+            if new_content:
+                write("\n\nТекущее состояние файла (ПОСЛЕ изменений):\n```\n")
+                write(new_content)
+                write("\n```")
+
+            write("\n\nКонкретные изменения (что поменялось):\n```diff\n")
+            write(diff)
+            write("\n```")
+            write(
+                "\n\nВАЖНО: Анализируй только изменения, показанные в diff выше. "
+                "Считай '-' как было ДО, '+' как стало ПОСЛЕ и оценивай пару '-'→'+'. "
+                "Если '+' исправляет недочёт из '-', не отмечай это как проблему. "
+                "Не предлагай те же изменения повторно — они уже применены. "
+                "Используй полный файл только для понимания контекста."
+            )
+
+        return buf.getvalue()
+
+    @staticmethod
+    def _make_review_entry(change: dict[str, Any], change_type: str, comments: str) -> dict[str, Any]:
+        """Shape a file_reviews entry from a change and its raw comments."""
+        comments_text = (comments or "").strip()
+        # The no-issue sentinel opens the response; startswith avoids an
+        # O(n) substring scan and blanking reviews that merely cite it.
+        if comments_text.startswith("Код выглядит корректно"):
+            comments_text = ""
+        return {
+            "file": change["file_path"],
+            "diff": change["diff"],
+            "comments": comments_text,
+            "new_content": change["new_content"],
+            "change_type": change_type,
+        }
+
+    def _review_batch(self, batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Review a batch with one API call, falling back to per-file calls.
+
+        Files whose exact context was reviewed recently come straight from
+        the persistent cache. Never raises on API failures: batch-level
+        failures retry per file, and per-file failures are logged and their
+        entries skipped. The one exception is a cache miss in replay mode,
+        whose RuntimeError must abort the run.
+        """
+        entries_by_pos: dict[int, dict[str, Any]] = {}
+        misses: list[tuple[int, dict[str, Any], str, str, str]] = []
+        for pos, change in enumerate(batch):
+            change_type = self._change_type(change)
+            if not self._should_review(change):
+                logger.debug("Skipping review for {}", change["file_path"])
+                continue
+            context = self._build_context(change, change_type)
+            key = review_cache.content_key(context, scope=self._client.cache_scope)
+            cached = review_cache.get(key)
+            if cached is not None:
+                entries_by_pos[pos] = self._make_review_entry(change, change_type, cached)
+            else:
+                misses.append((pos, change, change_type, context, key))
+
+        if len(misses) > 1:
+            try:
+                comments_by_file = self._client.review_diffs_batch(
+                    [(change["file_path"], context) for _, change, _, context, _ in misses]
+                )
+                unanswered = []
+                for miss in misses:
+                    pos, change, change_type, _, key = miss
+                    comments = comments_by_file.get(change["file_path"])
+                    if comments is None:
+                        # Truncated or salvaged responses can omit files;
+                        # leave them for the per-file fallback below rather
+                        # than passing them off as reviewed with no remarks.
+                        unanswered.append(miss)
+                        continue
+                    review_cache.put(key, comments)
+                    entries_by_pos[pos] = self._make_review_entry(change, change_type, comments)
+                misses = unanswered
+            except Exception as exc:
+                logger.debug("Batched review failed, retrying per file: {}", exc)
+
+        for pos, change, change_type, context, key in misses:
+            try:
+                comments = self._client.review_diffs(context)
+                review_cache.put(key, comments)
+                entries_by_pos[pos] = self._make_review_entry(change, change_type, comments)
+            except Exception as e:
+                logger.error(f"File analysis error for {change['file_path']}: {e}")
+
+        return [entries_by_pos[pos] for pos in sorted(entries_by_pos)]
+
+    def _build_summary(self, all_comments: list[str]) -> str:
+        """Build (or replay from cache) the overall review summary.
+
+        A replay-mode cache miss propagates so the caller can fail the run,
+        matching the per-file path; API errors degrade to an empty summary.
+        """
+        if not all_comments:
+            return "Проблем в коде не обнаружено."
+        joined_comments = "\n".join(all_comments)
+        key = review_cache.content_key(joined_comments, scope=self._client.cache_scope)
+        summary = review_cache.get(key)
+        if summary is not None:
+            return summary
+        try:
+            summary = self._client.global_summary(joined_comments, self.merge_request_data)
+            review_cache.put(key, summary)
+            return summary
+        except Exception as exc:
+            logger.debug("Summary build error: {}", exc)
+            return ""
+
     def get_review_comments(self) -> dict[str, Any]:
         if not self.enable_ai or not self._client:
             return {"diff_comments": [], "summary": "", "file_reviews": []}
 
         enhanced_changes = self.merge_request_data.get("enhanced_changes", [])
         if enhanced_changes:
-            file_reviews = []
-            all_comments = []
-
-            logger.info(f"Starting AI analysis of {len(enhanced_changes)} files...")
-
-            with tqdm(total=len(enhanced_changes), desc="Analyzing files", unit="file") as pbar:
-                for change in enhanced_changes:
-                    file_path = change["file_path"]
-                    pbar.set_description(f"Analyzing: {file_path.split('/')[-1]}")
-                    diff = change["diff"]
-                    new_content = change["new_content"]
-                    context_parts = []
-
-                    if change["new_file"]:
-                        context_parts.append(f"Новый файл: `{file_path}`")
-                        if new_content:
-                            context_parts.append(f"\nСодержимое нового файла:\n```\n{new_content}\n```")
-                    elif change["deleted_file"]:
-                        context_parts.append(f"Удаленный файл: `{file_path}`")
-                        context_parts.append(f"\nDiff удаления:\n```diff\n{diff}\n```")
-                    else:
-                        context_parts.append(f"Изменённый файл: `{file_path}`")
-
-                        if new_content:
-                            context_parts.append(
-                                f"\nТекущее состояние файла (ПОСЛЕ изменений):\n```\n{new_content}\n```"
-                            )
-
-                        context_parts.append(f"\nКонкретные изменения (что поменялось):\n```diff\n{diff}\n```")
-                        context_parts.append(
-                            "\nВАЖНО: Анализируй только изменения, показанные в diff выше. "
-                            "Считай '-' как было ДО, '+' как стало ПОСЛЕ и оценивай пару '-'→'+'. "
-                            "Если '+' исправляет недочёт из '-', не отмечай это как проблему. "
-                            "Не предлагай те же изменения повторно — они уже применены. "
-                            "Используй полный файл только для понимания контекста."
-                        )
-
-                    full_context = "\n".join(context_parts)
-
-                    try:
-                        file_comments = self._client.review_diffs(full_context)
-                        comments_text = (file_comments or "").strip()
-                        if "Код выглядит корректно" in comments_text:
-                            comments_text = ""
-
-                        review_entry = {
-                            "file": file_path,
-                            "diff": diff,
-                            "comments": comments_text,
-                            "new_content": new_content,
-                            "change_type": "new"
-                            if change["new_file"]
-                            else "deleted"
-                            if change["deleted_file"]
-                            else "modified",
-                        }
-                        file_reviews.append(review_entry)
-                        if comments_text:
-                            all_comments.append(comments_text)
-                    except Exception as e:
-                        logger.error(f"File analysis error for {file_path}: {e}")
-                    finally:
-                        pbar.update(1)
-
-            logger.info("Building overall summary...")
+            # Deferred so importing the reviewer (e.g. for config validation)
+            # doesn't pay tqdm's startup cost.
+            from tqdm import tqdm  # noqa: PLC0415
+
+            changes, duplicates = self._duplicate_groups(enhanced_changes)
+            if duplicates:
+                logger.info(f"Deduplicated {len(enhanced_changes) - len(changes)} files with identical diffs")
+            batches = self._pack_batches(changes)
+            logger.info(f"Starting AI analysis of {len(changes)} files in {len(batches)} requests...")
+
+            # The review calls are network-bound, so run the batches on a
+            # bounded thread pool; results land back in submission order.
+            batch_reviews: list[list[dict[str, Any]]] = [[] for _ in batches]
+            max_workers = min(Config.REVIEW_CONCURRENCY, len(batches))
+            executor = ThreadPoolExecutor(max_workers=max_workers)
             try:
-                if all_comments:
-                    summary = self._client.global_summary("\n".join(all_comments), self.merge_request_data)
-                else:
-                    summary = "Проблем в коде не обнаружено."
-            except Exception as exc:
-                logger.debug(f"Summary build error: {exc}")
-                summary = ""
+                # Under CI log redirection every refresh is a blocking stderr
+                # write, so the bar is disabled entirely off-tty; on a tty,
+                # mininterval throttles the redraws.
+                with tqdm(
+                    total=len(changes),
+                    desc="Analyzing files",
+                    unit="file",
+                    mininterval=0.5,
+                    disable=not sys.stderr.isatty(),
+                ) as pbar:
+                    futures = {executor.submit(self._review_batch, batch): i for i, batch in enumerate(batches)}
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        try:
+                            batch_reviews[i] = future.result()
+                        except RuntimeError as exc:
+                            # Replay-mode cache miss: the run can't proceed
+                            # without an API call, so fail it cleanly instead
+                            # of surfacing a worker traceback.
+                            logger.error(f"Review aborted: {exc}")
+                            raise SystemExit(1) from exc
+                        pbar.update(len(batches[i]))
+
+                # The last review is in; start the summary immediately so its
+                # network latency overlaps the assembly work below instead of
+                # waiting behind it.
+                all_comments = [
+                    entry["comments"] for entries in batch_reviews for entry in entries if entry["comments"]
+                ]
+                logger.info("Building overall summary...")
+                summary_future = executor.submit(self._build_summary, all_comments)
+
+                entries = [entry for entries in batch_reviews for entry in entries]
+                file_reviews = self._replicate_reviews(entries, duplicates)
+                try:
+                    summary = summary_future.result()
+                except RuntimeError as exc:
+                    # Replay-mode cache miss on the summary input.
+                    logger.error(f"Review aborted: {exc}")
+                    raise SystemExit(1) from exc
+            finally:
+                executor.shutdown(wait=False)
 
             return {
                 "diff_comments": [],
@@ -117,31 +248,34 @@ class GeminiReviewer(BaseReviewer):
 
             try:
                 raw_comments = self._client.review_diffs(diff_block)
-                diff_comments = [ln.strip("- ").strip() for ln in raw_comments.splitlines() if ln.strip()]
+                # One strip pass per line; islice stops after the 12 kept.
+                stripped = (s for ln in raw_comments.splitlines() if (s := ln.strip("- \t")))
+                diff_comments = list(islice(stripped, 12))
             except Exception as exc:
-                logger.debug(f"diff_comments generation error: {exc}")
+                logger.debug("diff_comments generation error: {}", exc)
                 diff_comments = []
 
-            return {"diff_comments": diff_comments[:12], "summary": "", "file_reviews": []}
+            return {"diff_comments": diff_comments, "summary": "", "file_reviews": []}
 
-        file_chunks = self._diff_parser.extract_file_chunks(diffs)
         file_reviews = []
         all_comments = []
 
-        for chunk in file_chunks:
+        # Chunks are parsed lazily; each one is reviewable and collectable
+        # before the next file is sliced out of the raw diff.
+        for chunk in self._diff_parser.iter_file_chunks(diffs):
             file_name = chunk["file"]
             file_diff = chunk["diff"]
 
             try:
                 file_comments = self._client.review_diffs(file_diff)
                 comments_text = (file_comments or "").strip()
-                if "Код выглядит корректно" in comments_text:
+                if comments_text.startswith("Код выглядит корректно"):
                     comments_text = ""
                 file_reviews.append({"file": file_name, "diff": file_diff, "comments": comments_text})
                 if comments_text:
                     all_comments.append(comments_text)
             except Exception as exc:
-                logger.debug(f"File analysis error for {file_name}: {exc}")
+                logger.debug("File analysis error for {}: {}", file_name, exc)
 
         try:
             if all_comments:
@@ -149,7 +283,7 @@ class GeminiReviewer(BaseReviewer):
             else:
                 summary = "Проблем в коде не обнаружено."
         except Exception as exc:
-            logger.debug(f"Summary generation error: {exc}")
+            logger.debug("Summary generation error: {}", exc)
             summary = ""
 
         return {
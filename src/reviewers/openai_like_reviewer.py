@@ -1,13 +1,16 @@
 """OpenAI-compatible code reviewer for various providers."""
 
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from typing import Any
 
 from loguru import logger
-from tqdm import tqdm
 
 from src.config import Config
 from src.parsers.diff_parser import DiffParser
 from src.reviewers.base_reviewer import BaseReviewer
+from src.utils import review_cache
 from src.utils.openai_like_client import OpenAILikeClient
 
 
@@ -26,6 +29,141 @@ class OpenAILikeReviewer(BaseReviewer):
         self._client = client or (OpenAILikeClient() if self.enable_ai else None)
         self._diff_parser = DiffParser()
 
+    def _build_context(self, change: dict[str, Any]) -> str:
+        """Assemble the review context for a single enhanced change.
+
+        Each branch is one f-string, so the context is built in a single
+        allocation instead of growing a list and joining it.
+        """
+        file_path = change["file_path"]
+        diff = change["diff"]
+        new_content = self._contextual_window(change["new_content"], diff)
+
+        if change["new_file"]:
+            if new_content:
+                return f"Новый файл: `{file_path}`\n\nСодержимое нового файла:\n```\n{new_content}\n```"
+            return f"Новый файл: `{file_path}`"
+
+        if change["deleted_file"]:
+            return f"Удаленный файл: `{file_path}`\n\nDiff удаления:\n```diff\n{diff}\n```"
+
+        state = f"\n\nТекущее состояние файла (ПОСЛЕ изменений):\n```\n{new_content}\n```" if new_content else ""
+        return (
+            f"Изменённый файл: `{file_path}`{state}"
+            f"\n\nКонкретные изменения (что поменялось):\n```diff\n{diff}\n```"
+            "\n\nВАЖНО: Анализируй только изменения, показанные в diff выше. "
+            "Используй полный файл только для понимания контекста."
+        )
+
+    @staticmethod
+    def _make_review_entry(change: dict[str, Any], comments: str) -> dict[str, Any] | None:
+        """Shape a file_reviews entry; None when the model had no remarks.
+
+        Both no-issue phrasings are filtered: single-file prompts answer
+        "Код выглядит корректно", the batched prompt answers "LGTM".
+        """
+        comments_text = (comments or "").strip()
+        # Both sentinels open the response; startswith avoids an O(n)
+        # substring scan and blanking reviews that merely cite them.
+        if not comments_text or comments_text.startswith(("Код выглядит корректно", "LGTM")):
+            return None
+        return {
+            "file": change["file_path"],
+            "diff": change["diff"],
+            "comments": comments_text,
+            "new_content": change["new_content"],
+            "change_type": "new" if change["new_file"] else "deleted" if change["deleted_file"] else "modified",
+        }
+
+    def _reviewable(self, change: dict[str, Any]) -> bool:
+        """_should_review with a debug trace for skipped files."""
+        if self._should_review(change):
+            return True
+        logger.debug("Skipping review for {}", change["file_path"])
+        return False
+
+    def _review_batch(self, batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Review a batch with one API call, falling back to per-file calls.
+
+        Files whose exact context was reviewed recently come straight from
+        the persistent cache. Never raises on API failures: batch-level
+        failures retry per file, and per-file failures are logged and their
+        entries skipped. The one exception is a cache miss in replay mode,
+        whose RuntimeError must abort the run.
+        """
+        entries_by_pos: dict[int, dict[str, Any]] = {}
+        misses: list[tuple[int, dict[str, Any], str, str]] = []
+        for pos, change in enumerate(batch):
+            if not self._reviewable(change):
+                continue
+            context = self._build_context(change)
+            key = review_cache.content_key(context, scope=self._client.cache_scope)
+            cached = review_cache.get(key)
+            if cached is not None:
+                entry = self._make_review_entry(change, cached)
+                if entry is not None:
+                    entries_by_pos[pos] = entry
+            else:
+                misses.append((pos, change, context, key))
+
+        if len(misses) > 1:
+            try:
+                comments_by_file = self._client.review_diffs_batch(
+                    [(change["file_path"], context) for _, change, context, _ in misses]
+                )
+                unanswered = []
+                for miss in misses:
+                    pos, change, _, key = miss
+                    comments = comments_by_file.get(change["file_path"])
+                    if comments is None:
+                        # Truncated or salvaged responses can omit files;
+                        # leave them for the per-file fallback below rather
+                        # than passing them off as reviewed with no remarks.
+                        unanswered.append(miss)
+                        continue
+                    review_cache.put(key, comments)
+                    entry = self._make_review_entry(change, comments)
+                    if entry is not None:
+                        entries_by_pos[pos] = entry
+                misses = unanswered
+            except Exception as exc:
+                logger.debug("Batched review failed, retrying per file: {}", exc)
+
+        for pos, change, context, key in misses:
+            try:
+                comments = self._client.review_diffs(context)
+            except Exception as e:
+                logger.error(f"File analysis error for {change['file_path']}: {e}")
+                continue
+            review_cache.put(key, comments)
+            entry = self._make_review_entry(change, comments)
+            if entry is not None:
+                logger.debug("Found comments for {}", change["file_path"])
+                entries_by_pos[pos] = entry
+
+        return [entries_by_pos[pos] for pos in sorted(entries_by_pos)]
+
+    def _build_summary(self, all_comments: list[str]) -> str:
+        """Build (or replay from cache) the overall review summary.
+
+        A replay-mode cache miss propagates so the caller can fail the run,
+        matching the per-file path; API errors degrade to an empty summary.
+        """
+        if not all_comments:
+            return "Проблем в коде не обнаружено."
+        joined_comments = "\n".join(all_comments)
+        key = review_cache.content_key(joined_comments, scope=self._client.cache_scope)
+        summary = review_cache.get(key)
+        if summary is not None:
+            return summary
+        try:
+            summary = self._client.global_summary(joined_comments)
+            review_cache.put(key, summary)
+            return summary
+        except Exception as exc:
+            logger.debug("Summary build error: {}", exc)
+            return ""
+
     def get_review_comments(self) -> dict[str, Any]:
         """Get review comments from OpenAI-compatible models.
 
@@ -37,75 +175,61 @@ class OpenAILikeReviewer(BaseReviewer):
 
         enhanced_changes = self.merge_request_data.get("enhanced_changes", [])
         if enhanced_changes:
-            file_reviews = []
-            all_comments = []
-
-            logger.info(f"Starting AI analysis of {len(enhanced_changes)} files...")
-
-            with tqdm(total=len(enhanced_changes), desc="Analyzing files", unit="file") as pbar:
-                for change in enhanced_changes:
-                    file_path = change["file_path"]
-                    pbar.set_description(f"Analyzing: {file_path.split('/')[-1]}")
-                    diff = change["diff"]
-                    new_content = change["new_content"]
-
-                    context_parts = []
-
-                    if change["new_file"]:
-                        context_parts.append(f"Новый файл: `{file_path}`")
-                        if new_content:
-                            context_parts.append(f"\nСодержимое нового файла:\n```\n{new_content}\n```")
-                    elif change["deleted_file"]:
-                        context_parts.append(f"Удаленный файл: `{file_path}`")
-                        context_parts.append(f"\nDiff удаления:\n```diff\n{diff}\n```")
-                    else:
-                        context_parts.append(f"Изменённый файл: `{file_path}`")
-
-                        if new_content:
-                            context_parts.append(
-                                f"\nТекущее состояние файла (ПОСЛЕ изменений):\n```\n{new_content}\n```"
-                            )
-
-                        context_parts.append(f"\nКонкретные изменения (что поменялось):\n```diff\n{diff}\n```")
-                        context_parts.append(
-                            "\nВАЖНО: Анализируй только изменения, показанные в diff выше. "
-                            "Используй полный файл только для понимания контекста."
-                        )
-
-                    full_context = "\n".join(context_parts)
-
-                    try:
-                        file_comments = self._client.review_diffs(full_context)
-                        if file_comments.strip() and "Код выглядит корректно" not in file_comments:
-                            file_reviews.append(
-                                {
-                                    "file": file_path,
-                                    "diff": diff,
-                                    "comments": file_comments.strip(),
-                                    "new_content": new_content,
-                                    "change_type": "new"
-                                    if change["new_file"]
-                                    else "deleted"
-                                    if change["deleted_file"]
-                                    else "modified",
-                                }
-                            )
-                            all_comments.append(file_comments)
-                            logger.debug(f"Found comments for {file_path}")
-                    except Exception as e:
-                        logger.error(f"File analysis error for {file_path}: {e}")
-                    finally:
-                        pbar.update(1)
-
-            logger.info("Building overall summary...")
+            # Deferred so importing the reviewer (e.g. for config validation)
+            # doesn't pay tqdm's startup cost.
+            from tqdm import tqdm  # noqa: PLC0415
+
+            changes, duplicates = self._duplicate_groups(enhanced_changes)
+            if duplicates:
+                logger.info(f"Deduplicated {len(enhanced_changes) - len(changes)} files with identical diffs")
+            batches = self._pack_batches(changes)
+            logger.info(f"Starting AI analysis of {len(changes)} files in {len(batches)} requests...")
+
+            # The review calls are network-bound, so fan the batches out on a
+            # bounded thread pool; results land back in submission order.
+            batch_reviews: list[list[dict[str, Any]]] = [[] for _ in batches]
+            max_workers = min(Config.REVIEW_CONCURRENCY, len(batches))
+            executor = ThreadPoolExecutor(max_workers=max_workers)
             try:
-                if all_comments:
-                    summary = self._client.global_summary("\n".join(all_comments))
-                else:
-                    summary = "Проблем в коде не обнаружено."
-            except Exception as exc:
-                logger.debug(f"Summary build error: {exc}")
-                summary = ""
+                # Disabled off-tty: under CI log redirection every refresh is
+                # a blocking stderr write.
+                with tqdm(
+                    total=len(changes),
+                    desc="Analyzing files",
+                    unit="file",
+                    mininterval=0.5,
+                    disable=not sys.stderr.isatty(),
+                ) as pbar:
+                    futures = {executor.submit(self._review_batch, batch): i for i, batch in enumerate(batches)}
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        try:
+                            batch_reviews[i] = future.result()
+                        except RuntimeError as exc:
+                            # Replay-mode cache miss: the run can't proceed
+                            # without an API call, so fail it cleanly instead
+                            # of surfacing a worker traceback.
+                            logger.error(f"Review aborted: {exc}")
+                            raise SystemExit(1) from exc
+                        pbar.update(len(batches[i]))
+
+                # The last review is in; start the summary immediately so its
+                # network latency overlaps the assembly work below instead of
+                # waiting behind it.
+                all_comments = [entry["comments"] for entries in batch_reviews for entry in entries]
+                logger.info("Building overall summary...")
+                summary_future = executor.submit(self._build_summary, all_comments)
+
+                entries = [entry for entries in batch_reviews for entry in entries]
+                file_reviews = self._replicate_reviews(entries, duplicates)
+                try:
+                    summary = summary_future.result()
+                except RuntimeError as exc:
+                    # Replay-mode cache miss on the summary input.
+                    logger.error(f"Review aborted: {exc}")
+                    raise SystemExit(1) from exc
+            finally:
+                executor.shutdown(wait=False)
 
             return {
                 "diff_comments": [],
@@ -120,26 +244,30 @@ class OpenAILikeReviewer(BaseReviewer):
 
             try:
                 raw_comments = self._client.review_diffs(diff_block)
-                diff_comments = [ln.strip("- ").strip() for ln in raw_comments.splitlines() if ln.strip()]
+                # One strip pass per line; islice stops after the 12 kept.
+                stripped = (s for ln in raw_comments.splitlines() if (s := ln.strip("- \t")))
+                diff_comments = list(islice(stripped, 12))
             except Exception as exc:
                 logger.debug(f"diff_comments generation error: {exc}")
                 diff_comments = []
 
-            return {"diff_comments": diff_comments[:12], "summary": "", "file_reviews": []}
+            return {"diff_comments": diff_comments, "summary": "", "file_reviews": []}
 
-        file_chunks = self._diff_parser.extract_file_chunks(diffs)
         file_reviews = []
         all_comments = []
 
-        for chunk in file_chunks:
+        # Chunks are parsed lazily; each one is reviewable and collectable
+        # before the next file is sliced out of the raw diff.
+        for chunk in self._diff_parser.iter_file_chunks(diffs):
             file_name = chunk["file"]
             file_diff = chunk["diff"]
 
             try:
                 file_comments = self._client.review_diffs(file_diff)
-                if file_comments.strip() and "Код выглядит корректно" not in file_comments:
-                    file_reviews.append({"file": file_name, "diff": file_diff, "comments": file_comments.strip()})
-                    all_comments.append(file_comments)
+                stripped = file_comments.strip()
+                if stripped and not stripped.startswith(("Код выглядит корректно", "LGTM")):
+                    file_reviews.append({"file": file_name, "diff": file_diff, "comments": stripped})
+                    all_comments.append(stripped)
             except Exception as exc:
                 logger.debug(f"File analysis error for {file_name}: {exc}")
 
@@ -1,5 +1,6 @@
 """Factory for creating code reviewers."""
 
+from functools import lru_cache
 from typing import Any
 
 from src.config import Config
@@ -11,6 +12,62 @@ from src.utils.logging import get_logger
 logger = get_logger()
 
 
+@lru_cache(maxsize=1)
+def _shared_gemini_client():
+    """Build the Gemini SDK client once per process.
+
+    Config is a frozen per-process snapshot, so there is nothing to key the
+    cache on: the same credentials produce the same client for every MR.
+    """
+    from src.utils.gemini_client import GeminiClient  # noqa: PLC0415
+
+    return GeminiClient() if Config.GEMINI_API_KEY else None
+
+
+@lru_cache(maxsize=1)
+def _shared_openai_like_client():
+    """Build the OpenAI-compatible SDK client once per process."""
+    from src.utils.openai_like_client import OpenAILikeClient  # noqa: PLC0415
+
+    return OpenAILikeClient() if Config.OPENAI_LIKE_API_KEY else None
+
+
+@lru_cache(maxsize=1)
+def _select_provider() -> str:
+    """Resolve which reviewer provider this process will use, once.
+
+    Availability only depends on the frozen Config snapshot (the checks are
+    local key tests, not network probes), so the cascade — configured
+    provider first, then any available one — yields the same answer for
+    every MR; caching skips re-running it and re-logging the warnings in
+    long-lived workers.
+
+    Raises:
+        ValueError: If no provider is available.
+    """
+    provider = Config.REVIEWER_PROVIDER.lower()
+
+    if provider == "gemini":
+        if _shared_gemini_client() is not None:
+            return "gemini"
+        logger.warning("Warning: Gemini API unavailable (check GEMINI_API_KEY)")
+    elif provider == "openai_like":
+        if _shared_openai_like_client() is not None:
+            return "openai_like"
+        logger.warning("Warning: OpenAI-Like API unavailable (check OPENAI_LIKE_API_KEY)")
+    else:
+        logger.warning(f"Warning: Unknown reviewer provider: {provider}")
+
+    logger.info("Attempting to use any available reviewer...")
+
+    if _shared_gemini_client() is not None:
+        return "gemini"
+    if _shared_openai_like_client() is not None:
+        return "openai_like"
+
+    raise ValueError("No AI reviewer available. Configure GEMINI_API_KEY or OPENAI_LIKE_API_KEY")
+
+
 class ReviewerFactory:
     """Factory for creating code reviewers based on configuration."""
 
@@ -27,38 +84,12 @@ class ReviewerFactory:
         Raises:
             ValueError: If no suitable reviewer is available
         """
-        provider = Config.REVIEWER_PROVIDER.lower()
-
-        if provider == "gemini":
-            reviewer = GeminiReviewer(merge_request_data)
-            if reviewer.is_available():
-                logger.info(f"Using AI reviewer: {reviewer.provider_name}")
-                return reviewer
-            logger.warning("Warning: Gemini API unavailable (check GEMINI_API_KEY)")
-
-        elif provider == "openai_like":
-            reviewer = OpenAILikeReviewer(merge_request_data)
-            if reviewer.is_available():
-                logger.info(f"Using AI reviewer: {reviewer.provider_name}")
-                return reviewer
-            logger.warning("Warning: OpenAI-Like API unavailable (check OPENAI_LIKE_API_KEY)")
-
+        if _select_provider() == "gemini":
+            reviewer: BaseReviewer = GeminiReviewer(merge_request_data, client=_shared_gemini_client())
         else:
-            logger.warning(f"Warning: Unknown reviewer provider: {provider}")
-
-        logger.info("Attempting to use any available reviewer...")
-
-        gemini_reviewer = GeminiReviewer(merge_request_data)
-        if gemini_reviewer.is_available():
-            logger.info(f"Fallback to: {gemini_reviewer.provider_name}")
-            return gemini_reviewer
-
-        openai_like_reviewer = OpenAILikeReviewer(merge_request_data)
-        if openai_like_reviewer.is_available():
-            logger.info(f"Fallback to: {openai_like_reviewer.provider_name}")
-            return openai_like_reviewer
-
-        raise ValueError("No AI reviewer available. Configure GEMINI_API_KEY or OPENAI_LIKE_API_KEY")
+            reviewer = OpenAILikeReviewer(merge_request_data, client=_shared_openai_like_client())
+        logger.info(f"Using AI reviewer: {reviewer.provider_name}")
+        return reviewer
 
     @staticmethod
     def get_available_providers() -> list[str]:
@@ -78,9 +109,13 @@ class ReviewerFactory:
         return available
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def validate_configuration() -> dict[str, Any]:
         """Validate reviewer configuration.
 
+        The result only depends on Config, which is fixed for the process
+        lifetime, so it is computed once and memoized.
+
         Returns:
             Dictionary with validation results
         """
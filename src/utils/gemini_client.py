@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import json
+import operator
+import threading
+from functools import cached_property
 from typing import Any
 
 from src.config import Config
+from src.utils import http
 from src.utils.logging import get_logger
 
 logger = get_logger()
@@ -17,6 +22,91 @@ except ImportError:
     raise
 
 
+# Static prompts are module constants: built once at import, shared by
+# every call, and byte-stable so provider-side prompt caching can hit.
+# The system prompt is deliberately compact — it ships with every call,
+# so each sentence has to pay for its tokens.
+_SYSTEM_PROMPT = (
+    "Ты — опытный Senior Software Engineer, проводящий ревью кода: конструктивно, "
+    "вежливо, с объяснением, почему это важно и как сделать лучше.\n\n"
+    "Работай с unified diff: строки с '-' — было ДО, с '+' — стало ПОСЛЕ; оценивай пару "
+    "'-'→'+' как единое изменение. Не предлагай правки, уже присутствующие в '+', и не "
+    "помечай как проблему то, что '+' исправляет. Анализируй только изменения из diff, "
+    "полный файл используй лишь для контекста; ищи реальные проблемы в состоянии ПОСЛЕ.\n\n"
+    "Столпы ревью:\n"
+    "1. ФУНКЦИОНАЛЬНОСТЬ (FUNC): логические ошибки, обработка исключений, runtime-ошибки.\n"
+    "2. АРХИТЕКТУРА (ARCH): нарушение SOLID/DRY/KISS, связность, паттерны проектирования.\n"
+    "3. СТИЛЬ И ЧИТАЕМОСТЬ (STYLE): naming, сложность кода, магические числа, комментарии.\n"
+    "4. ИНФРАСТРУКТУРА (INFRA): производительность, управление ресурсами, развертывание.\n"
+    "5. БЕЗОПАСНОСТЬ (SEC): SQL-инъекции, XSS, CSRF, безопасные пути файлов, права доступа.\n\n"
+    "Группируй проблемы строго по приоритетам CRITICAL → HIGH → MEDIUM → LOW, внутри "
+    "приоритета — по столпам 1 → 5. Формат каждой проблемы (Markdown):\n"
+    "[<столп>][<приоритет>] <исходный_файл>:<номер_строки> - <описание_проблемы> - <как_исправить>\n\n"
+    "Пиши коротко, по делу, без эмодзи. "
+    "Если существенных проблем нет: 'Код выглядит корректно. Доработок не требуется.'"
+)
+
+_REVIEW_PROMPT = "Проведи ревью следующих изменений в коде:"
+
+_BATCH_PROMPT = (
+    "Проведи ревью КАЖДОГО из перечисленных ниже файлов по отдельности.\n"
+    "Ответ верни СТРОГО в виде JSON-массива без пояснений и форматирования вокруг:\n"
+    '[{"file": "<путь>", "comments": "<замечания или '
+    "'Код выглядит корректно. Доработок не требуется.'>\"}]"
+)
+
+_SUMMARY_PROMPT = (
+    "<task>\n"
+    "На основе найденных проблем создай итоговое резюме с акцентом на общую оценку и положительные моменты.\n"
+    "ВАЖНО: Начни с краткого описания того, что было реализовано в данном изменении кода.\n"
+    "</task>\n\n"
+    "<format>\n"
+    "### Обзор изменений\n"
+    "[Краткое описание того, что было реализовано/исправлено в данном merge request]\n\n"
+    "### Статус ревью: APPROVED | REQUEST_CHANGES | COMMENT\n\n"
+    "### Основные проблемы по столпам:\n"
+    "1. ФУНКЦИОНАЛЬНОСТЬ: [краткий статус]\n"
+    "2. АРХИТЕКТУРА: [краткий статус]\n"
+    "3. СТИЛЬ И ЧИТАЕМОСТЬ: [краткий статус]\n"
+    "4. ИНФРАСТРУКТУРА: [краткий статус]\n"
+    "5. БЕЗОПАСНОСТЬ: [краткий статус]\n\n"
+    "### Что сделано хорошо:\n"
+    "- [положительные аспекты кода]\n"
+    "- [хорошие архитектурные решения]\n"
+    "- [качественная реализация]\n\n"
+    "### Ключевые рекомендации:\n"
+    "- [список ключевых рекомендаций]\n\n"
+    "## Заключение\n"
+    "[Итоговый комментарий о качестве изменений и готовности к мержу]\n"
+    "</format>\n\n"
+    "<style>\n"
+    "Пиши коротко, без эмодзи, используй форматирование Markdown.\n"
+    "</style>"
+)
+
+
+def _salvage_batch_entries(text: str) -> list[dict]:
+    """Recover per-file entries from a malformed batched-review response.
+
+    A truncated or comment-wrapped JSON array still usually contains
+    well-formed {"file": ..., "comments": ...} objects; pulling them out
+    one by one saves the batch from falling back to per-file API calls.
+    """
+    decoder = json.JSONDecoder()
+    entries = []
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            obj, end = decoder.raw_decode(text, pos)
+        except ValueError:
+            pos = text.find("{", pos + 1)
+            continue
+        if isinstance(obj, dict) and "file" in obj:
+            entries.append(obj)
+        pos = text.find("{", end)
+    return entries
+
+
 class GeminiClient:
     """Official Google GenAI client wrapper."""
 
@@ -33,10 +123,61 @@ class GeminiClient:
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not configured")
 
-        self.client = genai.Client(api_key=self.api_key)
+        # The SDK object is built lazily on first API call, so availability
+        # probes and factory checks can construct client shells for free.
+        self._sdk_client: genai.Client | None = None
         # Token usage counters
         self._prompt_tokens = 0
         self._completion_tokens = 0
+        # Attribute getters for usage counters, resolved on first response.
+        self._usage_getters: tuple[Any, Any] | None = None
+        # Server-side cache of the static system prompt, created lazily.
+        self._cache_name: str | None = None
+        self._cache_attempted = False
+        self._cache_lock = threading.Lock()
+
+    @property
+    def client(self) -> genai.Client:
+        """Underlying GenAI SDK client, constructed on first use.
+
+        Routes the SDK's sync httpx client over the shared transport so LLM
+        calls reuse the same connection pool as provider REST traffic;
+        older SDKs without client_args fall back to their own pool.
+        """
+        if self._sdk_client is None:
+            try:
+                self._sdk_client = genai.Client(
+                    api_key=self.api_key,
+                    http_options=types.HttpOptions(client_args={"transport": http.shared_transport()}),
+                )
+            except Exception as exc:
+                logger.debug(f"Shared transport unsupported by google-genai, using SDK defaults: {exc}")
+                self._sdk_client = genai.Client(api_key=self.api_key)
+        return self._sdk_client
+
+    def _cached_system(self) -> str | None:
+        """Name of the server-side cached system prompt, or None.
+
+        Creating the cache once per session means every subsequent call
+        references the prompt by name instead of re-uploading it. Models
+        below the cache minimum token count (or endpoints without caching)
+        raise on creation; those fall back to inline system_instruction.
+        """
+        with self._cache_lock:
+            if not self._cache_attempted:
+                self._cache_attempted = True
+                try:
+                    cache = self.client.caches.create(
+                        model=self.model,
+                        config=types.CreateCachedContentConfig(
+                            system_instruction=self._system_prompt(),
+                            ttl="3600s",
+                        ),
+                    )
+                    self._cache_name = cache.name
+                except Exception as exc:
+                    logger.debug(f"Prompt cache unavailable, sending system prompt inline: {exc}")
+        return self._cache_name
 
     def review_chunk(self, prompt: str, code_diff: str) -> str:
         """Review code chunk using Gemini.
@@ -49,92 +190,63 @@ class GeminiClient:
             Review response from the model
         """
         try:
-            system_instruction = self._system_prompt()
             user_content = f"Prompt:\n{prompt}\n\nDiff:\n{code_diff}"
 
+            # cached_content and system_instruction are mutually exclusive;
+            # the cache already carries the system prompt.
+            cached = self._cached_system()
+            config = types.GenerateContentConfig(
+                cached_content=cached,
+                system_instruction=None if cached else self._system_prompt(),
+                temperature=0.1,
+                max_output_tokens=4000,
+                thinking_config=types.ThinkingConfig(thinking_budget=0),
+            )
+
             response = self.client.models.generate_content(
                 model=self.model,
                 contents=user_content,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    temperature=0.1,
-                    max_output_tokens=4000,
-                    thinking_config=types.ThinkingConfig(thinking_budget=0),
-                ),
+                config=config,
             )
 
-            # Accumulate token usage if available on response
-            try:
-                usage = getattr(response, "usage", None) or getattr(response, "usage_metadata", None)
-                if usage is not None:
-                    # Try multiple attribute names used across SDK versions
-                    in_tokens = (
-                        getattr(usage, "input_tokens", None)
-                        or getattr(usage, "prompt_token_count", None)
-                        or getattr(usage, "prompt_tokens", None)
-                        or 0
-                    )
-                    out_tokens = (
-                        getattr(usage, "output_tokens", None)
-                        or getattr(usage, "candidates_token_count", None)
-                        or getattr(usage, "completion_tokens", None)
-                        or 0
-                    )
-                    self._prompt_tokens += int(in_tokens or 0)
-                    self._completion_tokens += int(out_tokens or 0)
-            except Exception as exc:
-                logger.debug(f"Gemini usage parsing failed: {exc}")
+            self._accumulate_usage(response)
 
             return response.text or ""
 
         except Exception as exc:
             raise RuntimeError(f"Gemini API error: {exc}") from exc
 
+    # Usage attribute names used across SDK versions, in preference order.
+    _USAGE_IN_NAMES = ("input_tokens", "prompt_token_count", "prompt_tokens")
+    _USAGE_OUT_NAMES = ("output_tokens", "candidates_token_count", "completion_tokens")
+
+    def _accumulate_usage(self, response: Any) -> None:
+        """Add a response's token usage to the session counters.
+
+        The SDK version only has to be probed once: the first response that
+        carries usage pins a pair of attrgetters, and later responses do a
+        single attribute lookup instead of re-walking every known name.
+        Never raises — usage data is optional.
+        """
+        usage = getattr(response, "usage", None) or getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        if self._usage_getters is None:
+            in_name = next((n for n in self._USAGE_IN_NAMES if getattr(usage, n, None) is not None), None)
+            out_name = next((n for n in self._USAGE_OUT_NAMES if getattr(usage, n, None) is not None), None)
+            if in_name is None or out_name is None:
+                return
+            self._usage_getters = (operator.attrgetter(in_name), operator.attrgetter(out_name))
+        get_in, get_out = self._usage_getters
+        try:
+            self._prompt_tokens += int(get_in(usage) or 0)
+            self._completion_tokens += int(get_out(usage) or 0)
+        except (AttributeError, TypeError, ValueError) as exc:
+            logger.debug(f"Gemini usage parsing failed: {exc}")
+
     def _system_prompt(self) -> str:
         """Get system prompt for code review."""
-        return (
-            "<role>\n"
-            "Ты — опытный Senior Software Engineer, который проводит ревью кода. "
-            "Твой фидбек должен быть конструктивным, вежливым и обучающим. "
-            "Ты не просто указываешь на ошибки, но и объясняешь, почему это важно и как сделать лучше.\n"
-            "</role>\n\n"
-            "<diff_semantics>\n"
-            "Работай с unified diff. В нём:\n"
-            "- строки, начинающиеся с '-' — это было ДО (удалённые/заменённые строки),\n"
-            "- строки с '+' — это стало ПОСЛЕ (новые/заменяющие строки).\n"
-            "Сопоставляй пары '-' → '+', оценивай изменение как единое целое.\n"
-            "Никогда не предлагай в качестве рекомендации те же правки, которые уже присутствуют в '+' — \n"
-            "это уже сделано разработчиком. Если '+' исправляет или улучшает то, что было в '-', \n"
-            "не помечай это как проблему — пропусти.\n"
-            "</diff_semantics>\n\n"
-            "<task>\n"
-            "Анализируй только изменения из diff. Используй полный контекст файла только для понимания смысла.\n"
-            "Цель — находить реальные проблемы в получившемся коде (состояние ПОСЛЕ), \n"
-            "а не описывать или повторять внесённые изменения.\n"
-            "</task>\n\n"
-            "<pillars>\n"
-            "Ревью должно базироваться на пяти столпах:\n"
-            "1. ФУНКЦИОНАЛЬНОСТЬ (FUNC): логические ошибки, обработка исключений, runtime-ошибки.\n"
-            "2. АРХИТЕКТУРА (ARCH): нарушение SOLID/DRY/KISS, связность, чистота кода, паттерны проектирования.\n"
-            "3. СТИЛЬ И ЧИТАЕМОСТЬ (STYLE): naming, сложность кода, магические числа, комментарии.\n"
-            "4. ИНФРАСТРУКТУРА (INFRA): производительность, управление ресурсами, развертывание.\n"
-            "5. БЕЗОПАСНОСТЬ (SEC): SQL-инъекции, XSS, CSRF, безопасные пути файлов, права доступа.\n"
-            "</pillars>\n\n"
-            "<output_structure>\n"
-            "- Группируй проблемы СТРОГО по приоритетам: CRITICAL → HIGH → MEDIUM → LOW.\n"
-            "- Внутри каждого столпа сортируй по столпам: 1 → 2 → 3 → 4 → 5.\n"
-            "- Используй Markdown для форматирования.\n\n"
-            "Формат для каждой проблемы:\n"
-            "[<столп>][<приоритет>] <исходный_файл>:<номер_строки> - <описание_проблемы> - <как_исправить>\n"
-            "</output_structure>\n\n"
-            "<style>\n"
-            "Пиши коротко, по делу, без эмодзи. Не повторяй содержимое строк '+', \n"
-            "если это и есть внесённые изменения.\n"
-            "</style>\n\n"
-            "<fallback>\n"
-            "Если существенных проблем нет: 'Код выглядит корректно. Доработок не требуется.'\n"
-            "</fallback>"
-        )
+        return _SYSTEM_PROMPT
 
     def review_diffs(self, diffs: str) -> str:
         """Review code diffs.
@@ -146,8 +258,42 @@ class GeminiClient:
             Review response
         """
         logger.debug(f"Sending code for analysis to Gemini ({self.model})...")
-        prompt = "Проведи ревью следующих изменений в коде:"
-        return self.review_chunk(prompt, diffs)
+        return self.review_chunk(_REVIEW_PROMPT, diffs)
+
+    def review_diffs_batch(self, items: list[tuple[str, str]]) -> dict[str, str]:
+        """Review several files in a single request.
+
+        Args:
+            items: (file_path, review context) pairs
+
+        Returns:
+            Mapping of file path to review comments
+
+        Raises:
+            ValueError: If the model response is not the requested JSON
+        """
+        logger.debug(f"Sending {len(items)} files for batched analysis to Gemini ({self.model})...")
+        sections = "\n\n".join(f"=== Файл {i}: {path} ===\n{context}" for i, (path, context) in enumerate(items, 1))
+        text = self.review_chunk(_BATCH_PROMPT, sections).strip()
+
+        # Models often wrap JSON in a fenced code block despite instructions.
+        if text.startswith("```"):
+            text = text.split("\n", 1)[1] if "\n" in text else ""
+            text = text.rsplit("```", 1)[0]
+
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            # Tolerant pass before giving up: salvage whatever intact
+            # entries the response carries.
+            parsed = _salvage_batch_entries(text)
+            if not parsed:
+                raise
+        if not isinstance(parsed, list):
+            raise ValueError("Batched review response is not a JSON array")
+        return {
+            str(entry.get("file", "")): str(entry.get("comments", "")) for entry in parsed if isinstance(entry, dict)
+        }
 
     def global_summary(self, context: str, pr_info: dict[str, Any] | None = None) -> str:
         """Generate global summary of review.
@@ -161,35 +307,7 @@ class GeminiClient:
         """
         logger.debug("Building global summary...")
 
-        prompt = (
-            "<task>\n"
-            "На основе найденных проблем создай итоговое резюме с акцентом на общую оценку и положительные моменты.\n"
-            "ВАЖНО: Начни с краткого описания того, что было реализовано в данном изменении кода.\n"
-            "</task>\n\n"
-            "<format>\n"
-            "### Обзор изменений\n"
-            "[Краткое описание того, что было реализовано/исправлено в данном merge request]\n\n"
-            "### Статус ревью: APPROVED | REQUEST_CHANGES | COMMENT\n\n"
-            "### Основные проблемы по столпам:\n"
-            "1. ФУНКЦИОНАЛЬНОСТЬ: [краткий статус]\n"
-            "2. АРХИТЕКТУРА: [краткий статус]\n"
-            "3. СТИЛЬ И ЧИТАЕМОСТЬ: [краткий статус]\n"
-            "4. ИНФРАСТРУКТУРА: [краткий статус]\n"
-            "5. БЕЗОПАСНОСТЬ: [краткий статус]\n\n"
-            "### Что сделано хорошо:\n"
-            "- [положительные аспекты кода]\n"
-            "- [хорошие архитектурные решения]\n"
-            "- [качественная реализация]\n\n"
-            "### Ключевые рекомендации:\n"
-            "- [список ключевых рекомендаций]\n\n"
-            "## Заключение\n"
-            "[Итоговый комментарий о качестве изменений и готовности к мержу]\n"
-            "</format>\n\n"
-            "<style>\n"
-            "Пиши коротко, без эмодзи, используй форматирование Markdown.\n"
-            "</style>"
-        )
-        result = self.review_chunk(prompt, context)
+        result = self.review_chunk(_SUMMARY_PROMPT, context)
         logger.debug("Global summary ready")
         return result
 
@@ -201,7 +319,7 @@ class GeminiClient:
         """
         return bool(self.api_key)
 
-    @property
+    @cached_property
     def provider_name(self) -> str:
         """Get provider name.
 
@@ -210,6 +328,11 @@ class GeminiClient:
         """
         return f"Gemini ({self.model})"
 
+    @cached_property
+    def cache_scope(self) -> str:
+        """Key scope tying cached reviews to this model and system prompt."""
+        return f"{self.model}\0{_SYSTEM_PROMPT}"
+
     def get_usage(self) -> dict[str, int]:
         """Get aggregated token usage for this client session.
 
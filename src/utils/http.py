@@ -1,5 +1,12 @@
+import asyncio
+import atexit
+import copy
+import json as jsonlib
 import logging
+import time
+from pathlib import Path
 from typing import Any
+from urllib.parse import urlencode
 
 import httpx
 from httpx_retries import Retry, RetryTransport
@@ -7,21 +14,113 @@ from loguru import logger
 
 from src.config import Config
 
-_base_transport = httpx.HTTPTransport(retries=Config.MAX_RETRIES)
+try:
+    import orjson
+
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:  # orjson is an optional speedup; stdlib json works fine
+
+    def _loads(data: bytes) -> Any:
+        return jsonlib.loads(data)
+
+    def _dumps(obj: Any) -> bytes:
+        return jsonlib.dumps(obj).encode("utf-8")
+
+# HTTP/2 lets one TLS connection carry all concurrent streams to the same
+# host (GitHub and GitLab both speak h2), skipping per-connection handshake
+# and slow-start costs. Requires the optional h2 package; HTTP/1.1 otherwise.
+try:
+    import h2  # noqa: F401
+
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Shared pool sizing: enough keep-alive slots to cover the get_many fan-out
+# so concurrent requests reuse warm connections instead of re-handshaking.
+_limits = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+_base_transport = httpx.HTTPTransport(retries=Config.MAX_RETRIES, limits=_limits, http2=_HTTP2)
 _timeout = httpx.Timeout(
     connect=Config.TIMEOUT,
     read=Config.TIMEOUT,
     write=Config.TIMEOUT,
     pool=Config.TIMEOUT,
 )
+# Jittered backoff desynchronizes retries from concurrent workers, so a
+# recovering endpoint sees a trickle instead of a synchronized wave.
 _retries = Retry(
     total=Config.MAX_RETRIES + 1,  # including initial attempt
-    allowed_methods={"GET", "PUT", "DELETE", "HEAD", "OPTIONS", "POST"},
+    allowed_methods={"GET", "PUT", "DELETE", "HEAD", "OPTIONS"},
     status_forcelist={429, 500, 502, 503, 504},
-    backoff_factor=0.5,
+    backoff_factor=0.3,
+    backoff_jitter=0.5,
+)
+# POSTs get a shorter leash: only gateway errors are retried, and 429s are
+# left to the server's Retry-After handling (and the LLM SDKs' own retry
+# loops) so rate-limited writes don't amplify into a retry storm.
+_retries_post = Retry(
+    total=2,
+    allowed_methods={"POST"},
+    status_forcelist={502, 503, 504},
+    backoff_factor=0.3,
+    backoff_jitter=0.5,
 )
 _transport = RetryTransport(transport=_base_transport, retry=_retries)
+_post_transport = RetryTransport(transport=_base_transport, retry=_retries_post)
 _client = httpx.Client(transport=_transport, timeout=_timeout, follow_redirects=True)
+_post_client = httpx.Client(transport=_post_transport, timeout=_timeout, follow_redirects=True)
+
+# Close keep-alive connections cleanly instead of relying on GC at interpreter
+# teardown, when httpcore's own cleanup may already be half torn down.
+atexit.register(_client.close)
+atexit.register(_post_client.close)
+
+
+def shared_transport() -> httpx.BaseTransport:
+    """Retrying transport backing the module client, for SDKs that accept one.
+
+    Handing the same transport to an SDK-owned httpx.Client means its
+    requests share this module's connection pool (keep-alive, HTTP/2,
+    retries) instead of opening a parallel set of sockets. POSTs pass
+    through un-retried at this layer — the LLM SDKs run their own
+    jittered retry loops, and stacking the two would multiply attempts.
+    """
+    return _transport
+
+
+_llm_client: httpx.Client | None = None
+
+
+def llm_client() -> httpx.Client:
+    """Shared httpx client for LLM SDKs.
+
+    Reuses the module transport — one pool for all outbound HTTP — but with
+    a generous read timeout, since model generation can far outlast the
+    Config.TIMEOUT tuned for REST calls.
+    """
+    global _llm_client  # noqa: PLW0603 — lazy singleton, built on first use
+    if _llm_client is None:
+        timeout = httpx.Timeout(600.0, connect=Config.TIMEOUT)
+        _llm_client = httpx.Client(transport=_transport, timeout=timeout, follow_redirects=True)
+        atexit.register(_llm_client.close)
+    return _llm_client
+
+
+def _async_client() -> httpx.AsyncClient:
+    """Build an AsyncClient sharing the module's retry/timeout/pool settings.
+
+    Async connections are bound to the event loop they were opened on, and
+    each fan-out helper runs its own asyncio.run loop, so the client is
+    created per loop rather than kept as a module singleton; within one
+    fan-out all requests still share its pool.
+    """
+    transport = RetryTransport(transport=httpx.AsyncHTTPTransport(limits=_limits, http2=_HTTP2), retry=_retries)
+    return httpx.AsyncClient(transport=transport, timeout=_timeout, follow_redirects=True)
 
 
 class _LoguruHandler(logging.Handler):
@@ -30,7 +129,7 @@ class _LoguruHandler(logging.Handler):
             level = record.levelname
             logger.bind(src_logger=record.name).log(level, record.getMessage())
         except Exception as exc:
-            logger.debug(f"log bridge error: {exc}")
+            logger.debug("log bridge error: {}", exc)
 
 
 _retry_logger = logging.getLogger("httpx_retries")
@@ -48,22 +147,261 @@ def _request(
     params: dict[str, Any] | None = None,
     json: dict[str, Any] | None = None,
 ) -> httpx.Response:
-    logger.debug(f"HTTP {method} {url}")
-    resp = _client.request(method, url, headers=headers, params=params, json=json)
+    logger.debug("HTTP {} {}", method, url)
+    content = None
+    if json is not None:
+        # Serialize request bodies ourselves so orjson handles both
+        # directions instead of only the response side.
+        content = _dumps(json)
+        headers = {**(headers or {}), "Content-Type": "application/json"}
+    client = _post_client if method == "POST" else _client
+    resp = client.request(method, url, headers=headers, params=params, content=content)
     resp.raise_for_status()
     return resp
 
 
 def get(url: str, headers: dict[str, str] | None = None, params: dict[str, Any] | None = None):
-    return _request("GET", url, headers=headers, params=params).json()
+    return _loads(_request("GET", url, headers=headers, params=params).content)
+
+
+# Chunk size for streamed text bodies.
+_STREAM_CHUNK = 65536
+
+
+def get_text(url: str, headers: dict[str, str] | None = None, params: dict[str, Any] | None = None) -> str:
+    """GET a plain-text body (e.g. a raw diff or file requested via an Accept header).
+
+    The body is streamed into one bytes buffer so a large file never holds
+    the framework's full response copy alongside the decoded string.
+    """
+    logger.debug("HTTP GET {}", url)
+    with _client.stream("GET", url, headers=headers, params=params) as resp:
+        resp.raise_for_status()
+        buf = bytearray()
+        for chunk in resp.iter_bytes(_STREAM_CHUNK):
+            buf.extend(chunk)
+    return buf.decode("utf-8", errors="replace")
+
+
+# --- Conditional (ETag / Last-Modified) GET cache -------------------------
+#
+# GitHub answers revalidation requests with 304 + empty body, which skips the
+# download and does not count against the primary rate limit.
+
+_ETAG_CACHE_FILE = Path.home() / ".cache" / "llm-code-review" / "etags.json"
+_etag_cache: dict[str, Any] | None = None
+
+
+def _cache_key(url: str, params: dict[str, Any] | None) -> str:
+    if not params:
+        return url
+    return url + "?" + urlencode(sorted(params.items()))
+
+
+def _get_etag_cache() -> dict[str, Any]:
+    global _etag_cache  # noqa: PLW0603 — lazy singleton, loaded on first use
+    if _etag_cache is None:
+        try:
+            _etag_cache = _loads(_ETAG_CACHE_FILE.read_bytes())
+        except (OSError, ValueError):
+            _etag_cache = {}
+    return _etag_cache
+
+
+def _save_etag_cache() -> None:
+    try:
+        _ETAG_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _ETAG_CACHE_FILE.write_bytes(_dumps(_get_etag_cache()))
+    except OSError as exc:
+        logger.debug("ETag cache write failed: {}", exc)
+
+
+def _conditional_headers(entry: dict[str, Any] | None, headers: dict[str, str] | None) -> dict[str, str]:
+    """Copy headers and add If-None-Match/If-Modified-Since from a cache entry."""
+    cond_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            cond_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            cond_headers["If-Modified-Since"] = entry["last_modified"]
+    return cond_headers
+
+
+def _remember_validators(key: str, resp: httpx.Response, body: Any) -> bool:
+    """Store the body with its ETag/Last-Modified validators; True if stored."""
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if not (etag or last_modified):
+        return False
+    # Deep-copy so callers mutating the returned body (providers enrich it
+    # in place) can't bloat the persisted cache with derived data.
+    _get_etag_cache()[key] = {"etag": etag, "last_modified": last_modified, "body": copy.deepcopy(body)}
+    return True
+
+
+def get_conditional(url: str, headers: dict[str, str] | None = None, params: dict[str, Any] | None = None):
+    """GET with ETag/Last-Modified revalidation against a small disk cache.
+
+    On 304 the cached body is returned without re-downloading; on 200 the
+    fresh body and its validators are stored for the next run.
+    """
+    cache = _get_etag_cache()
+    key = _cache_key(url, params)
+    entry = cache.get(key)
+
+    logger.debug("HTTP GET {}", url)
+    resp = _client.request("GET", url, headers=_conditional_headers(entry, headers), params=params)
+    if resp.status_code == 304 and entry is not None:
+        logger.debug("HTTP 304 (cache hit) {}", url)
+        return copy.deepcopy(entry["body"])
+    resp.raise_for_status()
+
+    body = _loads(resp.content)
+    if _remember_validators(key, resp, body):
+        _save_etag_cache()
+    return body
+
+
+def get_conditional_many(
+    requests: list[tuple[str, dict[str, Any] | None]],
+    headers: dict[str, str] | None = None,
+) -> list[Any]:
+    """Issue several conditional GETs concurrently.
+
+    Revalidation works as in get_conditional; the independent requests are
+    simply in flight at the same time, so the wall time is the slowest
+    round-trip instead of their sum.
+
+    Returns:
+        One entry per input pair, in order: the decoded body on success or
+        the raised exception on failure.
+    """
+    cache = _get_etag_cache()
+
+    async def _fetch_all() -> list[Any]:
+        async with _async_client() as client:
+
+            async def _fetch_one(url: str, params: dict[str, Any] | None) -> Any:
+                key = _cache_key(url, params)
+                entry = cache.get(key)
+                logger.debug("HTTP GET {}", url)
+                resp = await client.get(url, headers=_conditional_headers(entry, headers), params=params)
+                if resp.status_code == 304 and entry is not None:
+                    logger.debug("HTTP 304 (cache hit) {}", url)
+                    return copy.deepcopy(entry["body"])
+                resp.raise_for_status()
+                body = _loads(resp.content)
+                _remember_validators(key, resp, body)
+                return body
+
+            return await asyncio.gather(
+                *(_fetch_one(url, params) for url, params in requests),
+                return_exceptions=True,
+            )
+
+    results = asyncio.run(_fetch_all())
+    _save_etag_cache()
+    return results
+
+
+# Cap on simultaneous in-flight requests in get_many.
+_MAX_CONCURRENCY = 16
+
+# Pause the fan-out when this few primary rate-limit requests remain.
+_RATE_LIMIT_FLOOR = 5
+
+
+def _retry_after_delay(resp: httpx.Response) -> float | None:
+    """Seconds to wait before retrying a rate-limited response, else None.
+
+    GitHub signals secondary rate limits with 403/429 plus a Retry-After
+    header; honoring it and retrying once keeps a burst of per-file fetches
+    from failing outright.
+    """
+    if resp.status_code not in (403, 429):
+        return None
+    retry_after = resp.headers.get("Retry-After", "")
+    return float(retry_after) if retry_after.isdigit() else None
+
+
+async def _pace_rate_limit(resp: httpx.Response) -> None:
+    """Sleep until the rate-limit window resets when it is nearly exhausted."""
+    remaining = resp.headers.get("X-RateLimit-Remaining", "")
+    if not remaining.isdigit() or int(remaining) >= _RATE_LIMIT_FLOOR:
+        return
+    reset = resp.headers.get("X-RateLimit-Reset", "")
+    if reset.isdigit():
+        delay = max(0.0, int(reset) - time.time())
+        if delay:
+            logger.warning(f"Rate limit nearly exhausted ({remaining} requests left); pausing {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+
+def get_many(
+    requests: list[tuple[str, dict[str, Any] | None]],
+    headers: dict[str, str] | None = None,
+    concurrency: int = _MAX_CONCURRENCY,
+    as_text: bool = False,
+) -> list[Any]:
+    """Issue many GET requests concurrently over one connection pool.
+
+    Args:
+        requests: List of (url, params) pairs.
+        headers: Headers shared by all requests.
+        concurrency: Maximum number of in-flight requests.
+        as_text: Return raw text bodies instead of decoded JSON.
+
+    Returns:
+        One entry per input pair, in order: the decoded body on success or
+        the raised exception on failure.
+    """
+
+    async def _fetch_all() -> list[Any]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with _async_client() as client:
+
+            async def _fetch_one(url: str, params: dict[str, Any] | None) -> Any:
+                async with semaphore:
+                    # The semaphore slot is held through any backoff sleeps on
+                    # purpose: a throttled response should slow the whole
+                    # fan-out, not just this one task.
+                    for attempt in (0, 1):
+                        logger.debug("HTTP GET {}", url)
+                        if as_text:
+                            async with client.stream("GET", url, headers=headers, params=params) as resp:
+                                delay = _retry_after_delay(resp)
+                                if delay is None or attempt:
+                                    resp.raise_for_status()
+                                    buf = bytearray()
+                                    async for chunk in resp.aiter_bytes(_STREAM_CHUNK):
+                                        buf.extend(chunk)
+                                    await _pace_rate_limit(resp)
+                                    return buf.decode("utf-8", errors="replace")
+                        else:
+                            resp = await client.get(url, headers=headers, params=params)
+                            delay = _retry_after_delay(resp)
+                            if delay is None or attempt:
+                                resp.raise_for_status()
+                                await _pace_rate_limit(resp)
+                                return _loads(resp.content)
+                        logger.warning(f"Rate limited (HTTP {resp.status_code}); retrying in {delay:.0f}s")
+                        await asyncio.sleep(delay)
+
+            return await asyncio.gather(
+                *(_fetch_one(url, params) for url, params in requests),
+                return_exceptions=True,
+            )
+
+    return asyncio.run(_fetch_all())
 
 
 def post(url: str, headers: dict[str, str] | None = None, data: dict[str, Any] | None = None):
-    return _request("POST", url, headers=headers, json=data).json()
+    return _loads(_request("POST", url, headers=headers, json=data).content)
 
 
 def put(url: str, headers: dict[str, str] | None = None, data: dict[str, Any] | None = None):
-    return _request("PUT", url, headers=headers, json=data).json()
+    return _loads(_request("PUT", url, headers=headers, json=data).content)
 
 
 def delete(url: str, headers: dict[str, str] | None = None):
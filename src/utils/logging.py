@@ -1,19 +1,54 @@
 import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from loguru import logger
 
+from src.config import Config
 
-def setup_logging(level="INFO"):
+# Сжатие ротированного файла уходит в отдельный поток: иначе loguru жмёт
+# архив прямо в потоке записи, и на время упаковки весь лог встаёт.
+_compress_pool = ThreadPoolExecutor(max_workers=1)
+
+
+def _zip_file(path):
+    path = Path(path)
+    with zipfile.ZipFile(f"{path}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.write(path, arcname=path.name)
+    path.unlink()
+
+
+def _compress_async(path):
+    _compress_pool.submit(_zip_file, path)
+
+
+_configured = False
+
+
+def setup_logging(level=None):
     """
     Настройка логирования с помощью loguru.
     Логи пишутся в консоль и в файл с ротацией.
+
+    Явно переданный level имеет приоритет; без него консоль берёт
+    уровень из CONSOLE_LOG_LEVEL, файл пишется на уровне INFO.
+
+    Повторные вызовы (например, при повторном импорте модуля) ничего не
+    делают, чтобы не плодить дублирующие sink'и и строки в логах.
     """
+    global _configured  # noqa: PLW0603 — однократная инициализация sink'ов
+    if _configured:
+        return logger
+    _configured = True
+
     logger.remove()
 
+    # Уровень консоли настраивается отдельно (CONSOLE_LOG_LEVEL=WARNING в
+    # продакшене): stdout пишется синхронно и на горячем пути тормозит.
     logger.add(
         sys.stdout,
-        level=level,
+        level=level or Config.CONSOLE_LOG_LEVEL,
         format=(
             "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
             "<level>{level: <8}</level> | "
@@ -28,12 +63,17 @@ def setup_logging(level="INFO"):
 
     logger.add(
         log_dir / "app.log",
-        level=level,
+        level=level or "INFO",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
         rotation="5 MB",
         retention="10 days",
-        compression="zip",
+        compression=_compress_async,
         encoding="utf-8",
+        # Запись в файл идёт в фоновом потоке через очередь: вызывающий
+        # поток платит только за Queue.put, но не за диск.
+        enqueue=True,
+        backtrace=False,
+        diagnose=False,
     )
 
     return logger
@@ -44,20 +84,11 @@ def get_logger():
     return logger
 
 
-def log_info(message):
-    logger.info(message)
-
-
-def log_warning(message):
-    logger.warning(message)
-
-
-def log_error(message):
-    logger.error(message)
-
-
-def log_debug(message):
-    logger.debug(message)
+# Прямые алиасы вместо функций-обёрток: без лишнего кадра вызова.
+log_info = logger.info
+log_warning = logger.warning
+log_error = logger.error
+log_debug = logger.debug
 
 
 setup_logging()
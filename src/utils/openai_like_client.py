@@ -2,7 +2,14 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+from functools import cached_property
+
+import httpx
+
 from src.config import Config
+from src.utils import http
 from src.utils.logging import get_logger
 
 logger = get_logger()
@@ -14,6 +21,86 @@ except ImportError:
     raise
 
 
+# Static prompts are module constants: built once at import, shared by
+# every call, and byte-stable so provider-side prefix caching can hit.
+# The system prompt is deliberately compact — it ships with every call,
+# so each sentence has to pay for its tokens.
+_SYSTEM_PROMPT = (
+    "Ты — опытный Senior Software Engineer, проводящий ревью кода: конструктивно, "
+    "вежливо, с объяснением, почему это важно и как сделать лучше.\n\n"
+    "Работай с unified diff: строки с '-' — было ДО, с '+' — стало ПОСЛЕ; оценивай пару "
+    "'-'→'+' как единое изменение. Не предлагай правки, уже присутствующие в '+', и не "
+    "помечай как проблему то, что '+' исправляет. Анализируй только изменения из diff, "
+    "полный файл используй лишь для контекста; ищи реальные проблемы в состоянии ПОСЛЕ.\n\n"
+    "Столпы ревью:\n"
+    "1. ФУНКЦИОНАЛЬНОСТЬ (FUNC): логические ошибки, обработка исключений, runtime-ошибки.\n"
+    "2. АРХИТЕКТУРА (ARCH): нарушение SOLID/DRY/KISS, связность, паттерны проектирования.\n"
+    "3. СТИЛЬ И ЧИТАЕМОСТЬ (STYLE): naming, сложность кода, магические числа, комментарии.\n"
+    "4. ИНФРАСТРУКТУРА (INFRA): производительность, управление ресурсами, развертывание.\n"
+    "5. БЕЗОПАСНОСТЬ (SEC): SQL-инъекции, XSS, CSRF, безопасные пути файлов, права доступа.\n\n"
+    "Группируй проблемы строго по приоритетам CRITICAL → HIGH → MEDIUM → LOW, внутри "
+    "приоритета — по столпам 1 → 5. Формат каждой проблемы (Markdown):\n"
+    "[<столп>][<приоритет>] <исходный_файл>:<номер_строки> - <описание_проблемы> - <как_исправить>\n\n"
+    "Пиши коротко, по делу, без эмодзи. "
+    "Если существенных проблем нет: 'LGTM, доработок не требуется.'"
+)
+
+_REVIEW_PROMPT = "Проведи ревью следующих изменений в коде:"
+
+_BATCH_PROMPT = (
+    "Проведи ревью КАЖДОГО из перечисленных ниже файлов по отдельности.\n"
+    "Ответ верни СТРОГО в виде JSON-массива без пояснений и форматирования вокруг:\n"
+    '[{"file": "<путь>", "comments": "<замечания или '
+    "'LGTM, доработок не требуется.'>\"}]"
+)
+
+_SUMMARY_PROMPT = (
+    "<task>\n"
+    "На основе найденных проблем создай итоговое резюме с акцентом на общую оценку и положительные моменты.\n"
+    "</task>\n\n"
+    "<format>\n"
+    "## Статус: APPROVED | REQUEST_CHANGES | COMMENT\n\n"
+    "## Основные проблемы по столпам:\n"
+    "1. ФУНКЦИОНАЛЬНОСТЬ: [краткий статус]\n"
+    "2. АРХИТЕКТУРА: [краткий статус]\n"
+    "3. СТИЛЬ И ЧИТАЕМОСТЬ: [краткий статус]\n"
+    "4. ИНФРАСТРУКТУРА: [краткий статус]\n"
+    "5. БЕЗОПАСНОСТЬ: [краткий статус]\n\n"
+    "## Что сделано хорошо:\n"
+    "- [положительные аспекты кода]\n"
+    "- [хорошие архитектурные решения]\n"
+    "- [качественная реализация]\n\n"
+    "## Ключевые рекомендации:\n"
+    "- [список ключевых рекомендаций]\n"
+    "</format>\n\n"
+    "<style>\n"
+    "Пиши коротко, без эмодзи, используй форматирование Markdown.\n"
+    "</style>"
+)
+
+
+def _salvage_batch_entries(text: str) -> list[dict]:
+    """Recover per-file entries from a malformed batched-review response.
+
+    A truncated or comment-wrapped JSON array still usually contains
+    well-formed {"file": ..., "comments": ...} objects; pulling them out
+    one by one saves the batch from falling back to per-file API calls.
+    """
+    decoder = json.JSONDecoder()
+    entries = []
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            obj, end = decoder.raw_decode(text, pos)
+        except ValueError:
+            pos = text.find("{", pos + 1)
+            continue
+        if isinstance(obj, dict) and "file" in obj:
+            entries.append(obj)
+        pos = text.find("{", end)
+    return entries
+
+
 class OpenAILikeClient:
     """OpenAI-compatible API client for various providers."""
 
@@ -22,6 +109,7 @@ class OpenAILikeClient:
         api_key: str | None = None,
         model: str | None = None,
         base_url: str | None = None,
+        http_client: httpx.Client | None = None,
     ):
         """Initialize OpenAI-compatible client.
 
@@ -29,6 +117,7 @@ class OpenAILikeClient:
             api_key: API key for the provider
             model: Model identifier (e.g., 'anthropic/claude-3.5-sonnet')
             base_url: API base URL (e.g., 'https://api.openai.com/v1', 'https://openrouter.ai/api/v1')
+            http_client: Optional httpx client; defaults to the shared pool
         """
         self.api_key = api_key or Config.OPENAI_LIKE_API_KEY
         self.model = model or Config.OPENAI_LIKE_MODEL
@@ -37,15 +126,44 @@ class OpenAILikeClient:
         if not self.api_key:
             raise ValueError("OPENAI_LIKE_API_KEY not configured")
 
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-        )
+        # The SDK object is built lazily on first API call, so availability
+        # probes and factory checks can construct client shells for free.
+        self._sdk_client: OpenAI | None = None
+        self._http_client = http_client
+
+        # Stable routing key for provider-side prefix caching: requests
+        # sharing it land on the same cache shard, so the static system
+        # prompt's prefill is reused across the session's calls.
+        self._prompt_cache_key = hashlib.blake2b(f"{self.model}\0{_SYSTEM_PROMPT}".encode(), digest_size=16).hexdigest()
+
+        # Invariant request parts built once; the SDK only reads them.
+        self._system_msg = {"role": "system", "content": _SYSTEM_PROMPT}
+        self._extra_body = {
+            "transforms": ["middle-out"],
+            # Providers without prompt_cache_key ignore it, like OpenRouter
+            # ignores transforms on non-supporting routes.
+            "prompt_cache_key": self._prompt_cache_key,
+        }
 
         # Token usage counters
         self._prompt_tokens: int = 0
         self._completion_tokens: int = 0
 
+    @property
+    def client(self) -> OpenAI:
+        """Underlying OpenAI SDK client, constructed on first use.
+
+        Routing the SDK through the shared httpx client keeps one
+        connection pool for provider REST and LLM traffic alike.
+        """
+        if self._sdk_client is None:
+            self._sdk_client = OpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=self._http_client or http.llm_client(),
+            )
+        return self._sdk_client
+
     def review_chunk(self, prompt: str, code_diff: str) -> str:
         """Review code chunk using OpenAI-compatible API.
 
@@ -60,12 +178,13 @@ class OpenAILikeClient:
             completion = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": self._system_prompt()},
+                    # Keeping the static prompt as the leading message lets
+                    # OpenAI-style automatic prefix caching deduplicate it
+                    # across the session's calls.
+                    self._system_msg,
                     {"role": "user", "content": f"Prompt:\n{prompt}\n\nDiff:\n{code_diff}"},
                 ],
-                extra_body={
-                    "transforms": ["middle-out"],
-                },
+                extra_body=self._extra_body,
             )
 
             # Accumulate token usage if provided by the API
@@ -85,49 +204,7 @@ class OpenAILikeClient:
 
     def _system_prompt(self) -> str:
         """Get system prompt for code review."""
-        return (
-            "<role>\n"
-            "Ты — опытный Senior Software Engineer, который проводит ревью кода. "
-            "Твой фидбек должен быть конструктивным, вежливым и обучающим. "
-            "Ты не просто указываешь на ошибки, но и объясняешь, почему это важно и как сделать лучше.\n"
-            "</role>\n\n"
-            "<diff_semantics>\n"
-            "Работай с unified diff. В нём:\n"
-            "- строки, начинающиеся с '-' — это было ДО (удалённые/заменённые строки),\n"
-            "- строки с '+' — это стало ПОСЛЕ (новые/заменяющие строки).\n"
-            "Сопоставляй пары '-' → '+', оценивай изменение как единое целое.\n"
-            "Никогда не предлагай в качестве рекомендации те же правки, которые уже присутствуют в '+', — \n"
-            "это уже сделано разработчиком.\n"
-            "Если '+' исправляет или улучшает то, что было в '-', не помечай это как проблему — пропусти.\n"
-            "</diff_semantics>\n\n"
-            "<task>\n"
-            "Анализируй только изменения из diff. Используй полный контекст файла только для понимания смысла.\n"
-            "Цель — находить реальные проблемы в получившемся коде (состояние ПОСЛЕ), \n"
-            "а не описывать или повторять внесённые изменения.\n"
-            "</task>\n\n"
-            "<pillars>\n"
-            "Ревью должно базироваться на пяти столпах:\n"
-            "1. ФУНКЦИОНАЛЬНОСТЬ (FUNC): логические ошибки, обработка исключений, runtime-ошибки.\n"
-            "2. АРХИТЕКТУРА (ARCH): нарушение SOLID/DRY/KISS, связность, чистота кода, паттерны проектирования.\n"
-            "3. СТИЛЬ И ЧИТАЕМОСТЬ (STYLE): naming, сложность кода, магические числа, комментарии.\n"
-            "4. ИНФРАСТРУКТУРА (INFRA): производительность, управление ресурсами, развертывание.\n"
-            "5. БЕЗОПАСНОСТЬ (SEC): SQL-инъекции, XSS, CSRF, безопасные пути файлов, права доступа.\n"
-            "</pillars>\n\n"
-            "<output_structure>\n"
-            "- Группируй проблемы СТРОГО по приоритетам: CRITICAL → HIGH → MEDIUM → LOW.\n"
-            "- Внутри каждого столпа сортируй по столпам: 1 → 2 → 3 → 4 → 5.\n"
-            "- Используй Markdown для форматирования.\n\n"
-            "Формат для каждой проблемы:\n"
-            "[<столп>][<приоритет>] <исходный_файл>:<номер_строки> - <описание_проблемы> - <как_исправить>\n"
-            "</output_structure>\n\n"
-            "<style>\n"
-            "Пиши коротко, без эмодзи, используй форматирование Markdown. \n"
-            "Не повторяй содержимое строк '+', если это и есть внесённые изменения.\n"
-            "</style>\n\n"
-            "<fallback>\n"
-            "Если существенных проблем нет: 'LGTM, доработок не требуется.'\n"
-            "</fallback>"
-        )
+        return _SYSTEM_PROMPT
 
     def review_diffs(self, diffs: str) -> str:
         """Review code diffs.
@@ -139,8 +216,42 @@ class OpenAILikeClient:
             Review response
         """
         logger.debug(f"Sending code for analysis to {self.model}...")
-        prompt = "Проведи ревью следующих изменений в коде:"
-        return self.review_chunk(prompt, diffs)
+        return self.review_chunk(_REVIEW_PROMPT, diffs)
+
+    def review_diffs_batch(self, items: list[tuple[str, str]]) -> dict[str, str]:
+        """Review several files in a single request.
+
+        Args:
+            items: (file_path, review context) pairs
+
+        Returns:
+            Mapping of file path to review comments
+
+        Raises:
+            ValueError: If the model response is not the requested JSON
+        """
+        logger.debug(f"Sending {len(items)} files for batched analysis to {self.model}...")
+        sections = "\n\n".join(f"=== Файл {i}: {path} ===\n{context}" for i, (path, context) in enumerate(items, 1))
+        text = self.review_chunk(_BATCH_PROMPT, sections).strip()
+
+        # Models often wrap JSON in a fenced code block despite instructions.
+        if text.startswith("```"):
+            text = text.split("\n", 1)[1] if "\n" in text else ""
+            text = text.rsplit("```", 1)[0]
+
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            # Tolerant pass before giving up: salvage whatever intact
+            # entries the response carries.
+            parsed = _salvage_batch_entries(text)
+            if not parsed:
+                raise
+        if not isinstance(parsed, list):
+            raise ValueError("Batched review response is not a JSON array")
+        return {
+            str(entry.get("file", "")): str(entry.get("comments", "")) for entry in parsed if isinstance(entry, dict)
+        }
 
     def global_summary(self, context: str) -> str:
         """Generate global summary of review.
@@ -152,30 +263,7 @@ class OpenAILikeClient:
             Global summary response
         """
         logger.debug("Building global summary...")
-        prompt = (
-            "<task>\n"
-            "На основе найденных проблем создай итоговое резюме с акцентом на общую оценку и положительные моменты.\n"
-            "</task>\n\n"
-            "<format>\n"
-            "## Статус: APPROVED | REQUEST_CHANGES | COMMENT\n\n"
-            "## Основные проблемы по столпам:\n"
-            "1. ФУНКЦИОНАЛЬНОСТЬ: [краткий статус]\n"
-            "2. АРХИТЕКТУРА: [краткий статус]\n"
-            "3. СТИЛЬ И ЧИТАЕМОСТЬ: [краткий статус]\n"
-            "4. ИНФРАСТРУКТУРА: [краткий статус]\n"
-            "5. БЕЗОПАСНОСТЬ: [краткий статус]\n\n"
-            "## Что сделано хорошо:\n"
-            "- [положительные аспекты кода]\n"
-            "- [хорошие архитектурные решения]\n"
-            "- [качественная реализация]\n\n"
-            "## Ключевые рекомендации:\n"
-            "- [список ключевых рекомендаций]\n"
-            "</format>\n\n"
-            "<style>\n"
-            "Пиши коротко, без эмодзи, используй форматирование Markdown.\n"
-            "</style>"
-        )
-        result = self.review_chunk(prompt, context)
+        result = self.review_chunk(_SUMMARY_PROMPT, context)
         logger.debug("Global summary ready")
         return result
 
@@ -187,7 +275,7 @@ class OpenAILikeClient:
         """
         return bool(self.api_key)
 
-    @property
+    @cached_property
     def provider_name(self) -> str:
         """Get provider name.
 
@@ -196,6 +284,11 @@ class OpenAILikeClient:
         """
         return f"OpenAI-Like ({self.model})"
 
+    @cached_property
+    def cache_scope(self) -> str:
+        """Key scope tying cached reviews to this model and system prompt."""
+        return f"{self.model}\0{_SYSTEM_PROMPT}"
+
     def get_usage(self) -> dict[str, int]:
         """Get aggregated token usage for this client session.
 
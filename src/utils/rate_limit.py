@@ -1,24 +1,65 @@
-from collections import deque
-from time import sleep, time
+import threading
+from time import monotonic, sleep
 
 
-def rate_limit_decorator(max_calls, period):
-    calls = deque()
+class _Bucket:
+    """Thread-safe token bucket; callers sharing one share its budget.
+
+    Tokens accrue continuously at max_calls/period and each acquire spends
+    one, so an acquire is O(1). A drained bucket reserves its wait slot
+    under the lock (by advancing the accrual clock) and sleeps outside it,
+    so concurrent callers queue up instead of under-sleeping past the rate.
+    monotonic() is immune to wall-clock jumps.
+    """
+
+    def __init__(self, max_calls, period):
+        self._rate = max_calls / period
+        self._capacity = float(max_calls)
+        self._tokens = float(max_calls)
+        self._last = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            if self._tokens < 1.0:
+                wait = (1.0 - self._tokens) / self._rate
+                self._tokens = 0.0
+                self._last = now + wait
+            else:
+                wait = 0.0
+                self._tokens -= 1.0
+        if wait:
+            sleep(wait)
+
+
+_buckets: dict[str, _Bucket] = {}
+_registry_lock = threading.Lock()
+
+
+def get_bucket(name, max_calls, period=60.0):
+    """Shared bucket under a name (e.g. a provider/model identifier).
+
+    Every caller asking for the same name gets the same bucket, so several
+    decorated functions can draw from one rate budget. The first caller
+    fixes the rate.
+    """
+    with _registry_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            bucket = _buckets[name] = _Bucket(max_calls, period)
+        return bucket
+
+
+def rate_limit_decorator(max_calls, period, name=None):
+    # A private bucket by default; pass name= to draw from a shared one.
+    bucket = get_bucket(name, max_calls, period) if name else _Bucket(max_calls, period)
 
     def decorator(func):
         def wrapper(*args, **kwargs):
-            nonlocal calls
-            current_time = time()
-
-            while calls and calls[0] < current_time - period:
-                calls.popleft()
-
-            if len(calls) < max_calls:
-                calls.append(current_time)
-                return func(*args, **kwargs)
-            sleep_time = period - (current_time - calls[0])
-            sleep(sleep_time)
-            calls.append(time())
+            bucket.acquire()
             return func(*args, **kwargs)
 
         return wrapper
@@ -0,0 +1,90 @@
+"""Persistent cache of LLM review results keyed by content hash.
+
+Re-running a review (CI retry, rebase, trivial follow-up push) re-sends
+mostly identical per-file contexts to the model. Keying on a hash of the
+exact input lets unchanged files skip the API call entirely; entries
+expire after a week so stale reviews age out.
+
+REVIEW_CACHE_MODE picks the policy: "enabled" reads and writes,
+"read_only" replays hits without storing new results, "write_only"
+records results without serving them, "replay" serves only from cache
+and treats a miss as an error (deterministic reruns with zero API
+calls, e.g. when iterating on report formatting), "disabled" is a
+no-op.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from src.config import Config
+
+_CACHE_FILE = Path.home() / ".cache" / "llm-code-review" / "reviews.json"
+_TTL_SECONDS = 7 * 86400
+
+_cache: dict[str, Any] | None = None
+_lock = threading.Lock()
+
+
+def content_key(text: str, scope: str = "") -> str:
+    """Stable cache key for a piece of review input.
+
+    scope folds non-content inputs into the key — model name and system
+    prompt — so switching models or editing the prompt invalidates old
+    entries instead of replaying them.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if scope:
+        h.update(scope.encode("utf-8"))
+        h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _load() -> dict[str, Any]:
+    global _cache  # noqa: PLW0603 — lazy singleton, loaded on first use
+    if _cache is None:
+        try:
+            _cache = json.loads(_CACHE_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _cache = {}
+        # Expired entries are dropped once, on first access of the run.
+        cutoff = time.time() - _TTL_SECONDS
+        for key in [k for k, v in _cache.items() if v.get("ts", 0) < cutoff]:
+            del _cache[key]
+    return _cache
+
+
+def get(key: str) -> str | None:
+    """Return the cached review for key, or None on a miss.
+
+    Raises:
+        RuntimeError: On a miss in replay mode, where an API call would
+            break the run's no-network guarantee.
+    """
+    if Config.REVIEW_CACHE_MODE not in ("enabled", "read_only", "replay"):
+        return None
+    with _lock:
+        entry = _load().get(key)
+    if entry is None and Config.REVIEW_CACHE_MODE == "replay":
+        raise RuntimeError(f"Review cache miss for {key} in replay mode")
+    return entry["value"] if entry else None
+
+
+def put(key: str, value: str) -> None:
+    """Store a review result and persist the cache to disk."""
+    if Config.REVIEW_CACHE_MODE not in ("enabled", "write_only"):
+        return
+    with _lock:
+        cache = _load()
+        cache[key] = {"ts": time.time(), "value": value}
+        try:
+            _CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _CACHE_FILE.write_text(json.dumps(cache), encoding="utf-8")
+        except OSError as exc:
+            logger.debug("Review cache write failed: {}", exc)
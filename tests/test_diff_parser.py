@@ -26,6 +26,31 @@ index 83db48f..f735c8b 100644
     assert result == expected_output
 
 
+def test_parse_multiline_block(parser):
+    diff_data = """diff --git a/file1.py b/file1.py
+index 83db48f..f735c8b 100644
+--- a/file1.py
++++ b/file1.py
+@@ -1,4 +1,4 @@
+ def greet():
+-    name = "world"
+-    print("Hello, " + name)
++    name = "universe"
++    print(f"Hello, {name}")
+ """
+    # Consecutive -/+ runs pair positionally: each replaced line keeps its
+    # own new-side line number instead of all sharing the first one.
+    expected_output = {
+        "file": "file1.py",
+        "changes": [
+            {"line": 2, "old": '    name = "world"', "new": '    name = "universe"'},
+            {"line": 3, "old": '    print("Hello, " + name)', "new": '    print(f"Hello, {name}")'},
+        ],
+    }
+    result = parser.parse(diff_data)
+    assert result == expected_output
+
+
 def test_empty_diff(parser):
     diff_data = ""
     result = parser.parse(diff_data)
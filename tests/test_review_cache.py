@@ -0,0 +1,67 @@
+import pytest
+
+from src.utils import review_cache
+
+
+class _FakeConfig:
+    def __init__(self, mode):
+        self.REVIEW_CACHE_MODE = mode
+
+
+@pytest.fixture
+def set_mode(monkeypatch, tmp_path):
+    monkeypatch.setattr(review_cache, "_CACHE_FILE", tmp_path / "reviews.json")
+    monkeypatch.setattr(review_cache, "_cache", None)
+
+    def _set(mode):
+        monkeypatch.setattr(review_cache, "Config", _FakeConfig(mode))
+
+    return _set
+
+
+def test_enabled_round_trip(set_mode):
+    set_mode("enabled")
+    key = review_cache.content_key("diff text")
+    assert review_cache.get(key) is None
+    review_cache.put(key, "review")
+    assert review_cache.get(key) == "review"
+
+
+def test_read_only_serves_but_does_not_store(set_mode):
+    set_mode("enabled")
+    seeded = review_cache.content_key("seeded")
+    review_cache.put(seeded, "seeded review")
+
+    set_mode("read_only")
+    assert review_cache.get(seeded) == "seeded review"
+    fresh = review_cache.content_key("fresh")
+    review_cache.put(fresh, "dropped")
+    assert review_cache.get(fresh) is None
+
+
+def test_write_only_stores_but_does_not_serve(set_mode):
+    set_mode("write_only")
+    key = review_cache.content_key("diff text")
+    review_cache.put(key, "review")
+    assert review_cache.get(key) is None
+
+    set_mode("enabled")
+    assert review_cache.get(key) == "review"
+
+
+def test_replay_serves_hits_and_raises_on_miss(set_mode):
+    set_mode("enabled")
+    key = review_cache.content_key("seeded")
+    review_cache.put(key, "seeded review")
+
+    set_mode("replay")
+    assert review_cache.get(key) == "seeded review"
+    with pytest.raises(RuntimeError, match="replay mode"):
+        review_cache.get(review_cache.content_key("never reviewed"))
+
+
+def test_disabled_is_noop(set_mode):
+    set_mode("disabled")
+    key = review_cache.content_key("diff text")
+    review_cache.put(key, "review")
+    assert review_cache.get(key) is None